@@ -0,0 +1,14 @@
+"""Synthetic-airspace benchmarks for the deconfliction engine.
+
+Usage (from deconfliction_project/):
+    python -m benchmarks.generator -n 10000 -o flights.jsonl
+    python -m benchmarks.run --sizes 1000,10000 -o results.json
+    python -m benchmarks.run --sizes 1000,10000 -o new.json --compare results.json
+"""
+import os
+import sys
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
@@ -0,0 +1,84 @@
+"""Seeded generator of realistic synthetic airspaces.
+
+Most flights follow a small number of shared corridors (delivery routes, approach lanes)
+with some lateral scatter, the rest wander freely; every flight cruises in one altitude
+band and departs somewhere within the time spread. The same seed always produces the same
+airspace, so benchmark runs on different commits see identical inputs.
+"""
+from typing import List, Optional, Sequence, Tuple
+from models import Mission, SimulatedFlight
+import argparse
+import json
+import numpy as np
+
+DEFAULT_ALTITUDE_BANDS = ((30.0, 60.0), (60.0, 90.0), (90.0, 120.0))
+BASE_TIME = 1620000000.0
+
+def generate_flights(n_flights: int, seed: int = 0, area: float = 10000.0, waypoints: Tuple[int, int] = (3, 8),
+                     corridors: int = 12, corridor_share: float = 0.7, corridor_width: float = 150.0,
+                     altitude_bands: Sequence[Tuple[float, float]] = DEFAULT_ALTITUDE_BANDS,
+                     time_spread: float = 4 * 3600.0, speed: Tuple[float, float] = (5.0, 20.0),
+                     safety_buffer: Tuple[float, float] = (5.0, 20.0), prefix: str = "flight",
+                     model: type = SimulatedFlight) -> List[Mission]:
+    """Generate n_flights validated flights inside a square area of the given side (meters).
+
+    corridor_share of the flights follow one of the corridors, scattered up to corridor_width
+    either side of it; waypoints is the inclusive range of waypoints per flight.
+    """
+    rng = np.random.default_rng(seed)
+    corridor_ends = rng.uniform(0.0, area, size=(corridors, 2, 2))
+    bands = np.asarray(altitude_bands, dtype=np.float64)
+    flights = []
+    for i in range(n_flights):
+        count = int(rng.integers(waypoints[0], waypoints[1] + 1))
+        if corridors and rng.random() < corridor_share:
+            a, b = corridor_ends[rng.integers(corridors)]
+            if rng.random() < 0.5:
+                a, b = b, a  # Corridors are flown in both directions
+            along = np.sort(rng.uniform(0.0, 1.0, size=count))
+            xy = a + along[:, None] * (b - a)
+            normal = np.array([a[1] - b[1], b[0] - a[0]]) / max(np.linalg.norm(b - a), 1e-9)
+            xy += normal * rng.uniform(-corridor_width, corridor_width, size=(count, 1))
+        else:
+            steps = rng.normal(0.0, area / 10, size=(count, 2))
+            xy = rng.uniform(0.0, area, size=2) + np.cumsum(steps, axis=0)
+        xy = np.clip(xy, 0.0, area)
+        low, high = bands[rng.integers(len(bands))]
+        z = np.clip(rng.uniform(low, high) + rng.normal(0.0, 2.0, size=count), low, high)
+
+        path = float(np.linalg.norm(np.diff(np.column_stack([xy, z]), axis=0), axis=1).sum())
+        cruise = float(rng.uniform(*speed))
+        start_time = BASE_TIME + float(rng.uniform(0.0, time_spread))
+        flights.append(model(
+            drone_id=f"{prefix}_{i}",
+            waypoints=[{"x": float(x), "y": float(y), "z": float(h)} for (x, y), h in zip(xy, z)],
+            start_time=start_time,
+            end_time=start_time + max(path / cruise, 60.0),
+            speed=cruise,
+            safety_buffer=float(rng.uniform(*safety_buffer))
+        ))
+    return flights
+
+def generate_missions(n_missions: int, seed: int = 1, **kwargs) -> List[Mission]:
+    """Primary missions drawn from the same distribution as the airspace (use a different seed)."""
+    return generate_flights(n_missions, seed=seed, prefix="mission", model=Mission, **kwargs)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic airspace as JSON Lines.")
+    parser.add_argument("-n", "--flights", type=int, default=1000, help="Number of flights")
+    parser.add_argument("-o", "--output", required=True, help="JSON Lines file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--area", type=float, default=10000.0, help="Side of the square area in meters")
+    parser.add_argument("--corridors", type=int, default=12)
+    parser.add_argument("--time-spread", type=float, default=4 * 3600.0, help="Departure spread in seconds")
+    args = parser.parse_args(argv)
+
+    flights = generate_flights(args.flights, seed=args.seed, area=args.area, corridors=args.corridors,
+                               time_spread=args.time_spread)
+    with open(args.output, "w") as f:
+        for flight in flights:
+            f.write(json.dumps(flight.dict(exclude_none=True)) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
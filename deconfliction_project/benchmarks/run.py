@@ -0,0 +1,204 @@
+"""Run the engine benchmarks over synthetic airspaces and write machine-readable results.
+
+Each airspace size gets index build time and memory, single-mission and early-exit query
+latency, batch throughput, all-pairs audit time and HTTP endpoint latency. Results are JSON
+keyed by airspace size, so runs on two commits can be diffed with --compare.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from benchmarks.generator import generate_flights, generate_missions
+from airspace import AirspaceStore
+from deconfliction_engine import detect_conflicts, detect_conflicts_batch, detect_all_conflicts, first_conflict
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import logging
+
+def _timed(fn: Callable, *args, repeat: int = 1) -> float:
+    """Best wall time of repeat calls, which filters out scheduler and cache noise."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    samples_ms = np.asarray(samples) * 1000.0
+    return {"p50_ms": float(np.percentile(samples_ms, 50)), "p95_ms": float(np.percentile(samples_ms, 95)),
+            "max_ms": float(samples_ms.max())}
+
+def bench_build(flights) -> Tuple[Dict[str, float], AirspaceStore]:
+    """Time and trace the memory of building an auto-tuned airspace from validated flights.
+
+    Allocation tracing slows the build several-fold, so the timed build and the traced one are separate.
+    """
+    started = time.perf_counter()
+    airspace = AirspaceStore.from_flights(flights, grid_size=None)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    traced = AirspaceStore.from_flights(flights, grid_size=None)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+    return {
+        "build_seconds": elapsed,
+        "memory_bytes": current,
+        "build_peak_bytes": peak,
+        "segments": int(sum(len(trajectory) for trajectory in airspace)),
+        "index_cells": len(airspace.index.cells),
+        "grid_size": airspace.index.grid_size
+    }, airspace
+
+def bench_queries(airspace: AirspaceStore, missions, repeat: int = 3) -> Dict[str, float]:
+    full = [_timed(detect_conflicts, mission, airspace, repeat=repeat) for mission in missions]
+    first = [_timed(first_conflict, mission, airspace, repeat=repeat) for mission in missions]
+    conflicting = sum(1 for mission in missions if first_conflict(mission, airspace) is not None)
+    results = {f"query_{key}": value for key, value in _latency(full).items()}
+    results.update({f"first_conflict_{key}": value for key, value in _latency(first).items()})
+    results["conflicting_missions"] = conflicting
+    return results
+
+def bench_batch(airspace: AirspaceStore, missions, workers: Optional[int]) -> Dict[str, float]:
+    elapsed = _timed(detect_conflicts_batch, missions, airspace, workers)
+    return {"batch_seconds": elapsed, "batch_missions_per_second": len(missions) / elapsed}
+
+def bench_all_pairs(flights) -> Dict[str, float]:
+    started = time.perf_counter()
+    conflicts = detect_all_conflicts(flights, grid_size=None)
+    return {"all_pairs_seconds": time.perf_counter() - started, "all_pairs_conflicting_pairs": len(conflicts)}
+
+def bench_endpoints(flights, missions) -> Dict[str, float]:
+    """Latency of the HTTP API through Flask's test client, with the app's airspace replaced."""
+    import app
+    app.LOAD_PROGRESS.finished.wait()
+    for trajectory in list(app.AIRSPACE):
+        app.AIRSPACE.remove_flight(trajectory.drone_id)
+    for flight in flights:
+        app.AIRSPACE.add_flight(flight)
+    app.AIRSPACE.retune_grid()
+    app.RESULT_CACHE.clear()
+    client = app.app.test_client()
+
+    def post(mission):
+        started = time.perf_counter()
+        response = client.post('/api/analyze-mission', json={"mission": mission.dict(exclude_none=True)})
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"analyze-mission returned {response.status_code}: {response.get_data(as_text=True)}")
+        return elapsed
+
+    def get_health():
+        started = time.perf_counter()
+        client.get('/api/health')
+        return time.perf_counter() - started
+
+    uncached = [post(mission) for mission in missions]
+    cached = [post(mission) for mission in missions]
+    health = [get_health() for _ in missions]
+    results = {f"endpoint_{key}": value for key, value in _latency(uncached).items()}
+    results.update({f"endpoint_cached_{key}": value for key, value in _latency(cached).items()})
+    results.update({f"health_{key}": value for key, value in _latency(health).items()})
+    return results
+
+def run_benchmarks(sizes: List[int], missions: int = 50, seed: int = 0, workers: Optional[int] = None,
+                   all_pairs_max: int = 20000, endpoints: bool = True, repeat: int = 3) -> dict:
+    """Run every benchmark for each airspace size and return the results document."""
+    results = {}
+    for size in sizes:
+        flights = generate_flights(size, seed=seed)
+        primaries = generate_missions(missions, seed=seed + 1)
+        print(f"Benchmarking {size} flights", file=sys.stderr)
+        metrics, airspace = bench_build(flights)
+        metrics.update(bench_queries(airspace, primaries, repeat))
+        metrics.update(bench_batch(airspace, primaries, workers))
+        if size <= all_pairs_max:
+            metrics.update(bench_all_pairs(flights))
+        if endpoints:
+            metrics.update(bench_endpoints(flights, primaries))
+        results[str(size)] = metrics
+    return {"meta": run_metadata(seed, missions, repeat), "results": results}
+
+def run_metadata(seed: int, missions: int, repeat: int) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "missions": missions,
+        "repeat": repeat
+    }
+
+def lower_is_better(metric: str) -> Optional[bool]:
+    """Direction of a metric for comparisons, or None if it is informational."""
+    if metric.endswith("_per_second"):
+        return False
+    if metric.endswith(("_seconds", "_ms", "_bytes")):
+        return True
+    return None
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> List[dict]:
+    """Relative change of every directional metric present in both result documents."""
+    rows = []
+    for size, metrics in current["results"].items():
+        for metric, value in metrics.items():
+            direction = lower_is_better(metric)
+            before = baseline["results"].get(size, {}).get(metric)
+            if direction is None or not before:
+                continue
+            change = (value - before) / before
+            worse = change > threshold if direction else change < -threshold
+            better = change < -threshold if direction else change > threshold
+            rows.append({"size": size, "metric": metric, "baseline": before, "current": value, "change": change,
+                         "verdict": "regression" if worse else "improvement" if better else "unchanged"})
+    return rows
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the deconfliction engine on synthetic airspaces.")
+    parser.add_argument("--sizes", default="1000,5000", help="Comma-separated airspace sizes (flights)")
+    parser.add_argument("--missions", type=int, default=50, help="Primary missions per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query; the best time is kept")
+    parser.add_argument("--workers", type=int, default=None, help="Batch worker processes (default: config)")
+    parser.add_argument("--all-pairs-max", type=int, default=20000, help="Skip the all-pairs audit above this size")
+    parser.add_argument("--no-endpoints", action="store_true", help="Skip the HTTP endpoint benchmarks")
+    parser.add_argument("-o", "--output", help="Where to write the results (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as a regression")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)  # Time the engine, not its logging
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run_benchmarks(sizes, args.missions, args.seed, args.workers, args.all_pairs_max,
+                             not args.no_endpoints, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            rows = compare(json.load(f), results, args.threshold)
+        for row in rows:
+            print(f"{row['size']:>8} {row['metric']:<32} {row['baseline']:>14.4g} -> {row['current']:<14.4g} "
+                  f"{row['change']:+7.1%}  {row['verdict']}", file=sys.stderr)
+        if any(row["verdict"] == "regression" for row in rows):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -69,9 +69,24 @@ timeSlider.addEventListener('input', () => {
 
 async function fetchSimulatedFlights() {
     try {
-        const response = await fetch('http://localhost:5000/api/simulated-flights');
-        simulatedFlights = await response.json();
-        console.log('Fetched simulated flights:', simulatedFlights);
+        // Stream flights one per line, simplified to about one pixel; the browser revalidates with the ETag
+        const pixels = Math.round(renderer.domElement.width);
+        const response = await fetch(`http://localhost:5000/api/flights?format=ndjson&pixels=${pixels}`, { cache: 'no-cache' });
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const flights = [];
+        let buffered = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => flights.push(JSON.parse(line)));
+            if (done) break;
+        }
+        if (buffered.trim()) flights.push(JSON.parse(buffered));
+        simulatedFlights = flights;
+        console.log('Fetched simulated flights:', simulatedFlights.length);
         renderTrajectories();
     } catch (error) {
         console.error('Error fetching simulated flights:', error);
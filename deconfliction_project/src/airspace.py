@@ -0,0 +1,234 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from models import Mission
+from trajectory import Trajectory
+from spatial_index import SpatialIndex, DEFAULT_GRID_SIZE, suggest_grid_size
+from config import GRID_SIZE, TIME_BUCKET_SIZE
+from metrics import record_stage
+from contextlib import contextmanager
+import threading
+import time
+import logging
+
+# Configure logging for debugging and performance tracking
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ReadWriteLock:
+    """Lock that admits many concurrent readers or a single writer.
+
+    Waiting writers take priority over new readers so a steady stream of queries cannot
+    starve updates. Both sides are re-entrant per thread, and a thread holding the write
+    lock may also read; upgrading a read lock to a write lock is not supported.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self):
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            return
+        if self._writer == threading.get_ident():
+            # The writer already excludes everyone else, so its reads are not counted
+            self._local.depth = 1
+            self._local.counted = False
+            return
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+        self._local.counted = True
+
+    def release_read(self):
+        self._local.depth -= 1
+        if self._local.depth or not self._local.counted:
+            return
+        self._local.counted = False
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class AirspaceStore:
+    """Long-lived registry of active flights that owns the spatial index.
+
+    Flights are converted to timestamped Trajectory arrays and indexed once when registered,
+    so conflict queries only touch the cells around the mission being checked. Writes take
+    an exclusive lock and readers a shared one, so flights can be filed, amended and streamed
+    in while requests are served without any reader seeing a half-applied write.
+    """
+    def __init__(self, grid_size: Optional[float] = GRID_SIZE, time_bucket: float = TIME_BUCKET_SIZE):
+        self.index = SpatialIndex(grid_size=grid_size or DEFAULT_GRID_SIZE, time_bucket=time_bucket)
+        self.flights: Dict[str, Trajectory] = {}
+        self.segment_count = 0
+        # True when the grid size should be re-derived once the flights are known
+        self.auto_grid = grid_size is None
+        # Snapshot file this store was mapped from, cleared once the store diverges from it
+        self.snapshot_path: Optional[str] = None
+        # Bumped on every add or remove; listeners are told which flight changed
+        self.generation = 0
+        self.listeners: List[Callable[[Trajectory], None]] = []
+        self._lock = ReadWriteLock()
+
+    @classmethod
+    def from_flights(cls, flights: Iterable[Union[Mission, Trajectory]], grid_size: Optional[float] = GRID_SIZE,
+                     time_bucket: float = TIME_BUCKET_SIZE) -> 'AirspaceStore':
+        """Build a store pre-populated with the given flights.
+
+        When grid_size is None the cell size is derived from the flights' buffers and speeds.
+        """
+        if grid_size is None:
+            flights = [as_trajectory(flight) for flight in flights]
+            grid_size = suggest_grid_size(flights, time_bucket)
+        store = cls(grid_size=grid_size, time_bucket=time_bucket)
+        for flight in flights:
+            store.add_flight(flight)
+        return store
+
+    def add_flight(self, flight: Union[Mission, Trajectory]) -> Trajectory:
+        """Register a new flight, assigning its timestamps and indexing its segments."""
+        trajectory = as_trajectory(flight)
+        with self._lock.writing():
+            if trajectory.drone_id in self.flights:
+                raise ValueError(f"Flight {trajectory.drone_id} is already registered")
+            started = time.perf_counter()
+            self.index.add_trajectory(trajectory)
+            record_stage("index_insert", time.perf_counter() - started)
+            self.flights[trajectory.drone_id] = trajectory
+            self.segment_count += len(trajectory)
+            self._changed(trajectory)
+        return trajectory
+
+    def update_flight(self, flight: Union[Mission, Trajectory]) -> Trajectory:
+        """Replace an existing flight with an amended version in one atomic write."""
+        trajectory = as_trajectory(flight)
+        with self._lock.writing():
+            self.remove_flight(trajectory.drone_id)
+            return self.add_flight(trajectory)
+
+    def remove_flight(self, drone_id: str) -> Trajectory:
+        """Unregister a flight and drop its entries from the index."""
+        with self._lock.writing():
+            if drone_id not in self.flights:
+                raise KeyError(f"Flight {drone_id} is not registered")
+            self.index.remove_trajectory(drone_id)
+            trajectory = self.flights.pop(drone_id)
+            self.segment_count -= len(trajectory)
+            self._changed(trajectory)
+            return trajectory
+
+    def reading(self):
+        """Context manager holding a shared read lock, giving a consistent view across many queries."""
+        return self._lock.reading()
+
+    def add_listener(self, callback: Callable[[Trajectory], None]):
+        """Register a callback invoked (under the write lock) with each added or removed flight."""
+        self.listeners.append(callback)
+
+    def _changed(self, trajectory: Trajectory):
+        self.generation += 1
+        self.snapshot_path = None
+        for callback in self.listeners:
+            callback(trajectory)
+
+    def retune_grid(self, grid_size: Optional[float] = None):
+        """Rebuild the index with a new cell size, derived from the current flights by default."""
+        with self._lock.writing():
+            flights = list(self.flights.values())
+            if grid_size is None:
+                grid_size = suggest_grid_size(flights, self.index.time_bucket)
+            logger.info(f"Rebuilding airspace index with grid size {grid_size:.1f}")
+            started = time.perf_counter()
+            index = SpatialIndex(grid_size=grid_size, time_bucket=self.index.time_bucket)
+            for flight in flights:
+                index.add_trajectory(flight)
+            record_stage("index_build", time.perf_counter() - started)
+            self.index = index  # Swap in the finished index so readers never see a partial one
+
+    def query(self, row: Sequence[float], safety_buffer: float = 0.0) -> List[Tuple[Trajectory, int]]:
+        """Retrieve unique indexed segments within the combined safety buffer of a segment row."""
+        with self._lock.reading():
+            return self.index.query(row, safety_buffer)
+
+    def query_region(self, lo: Sequence[float], hi: Sequence[float], start_time: float,
+                     end_time: float) -> List[Tuple[Trajectory, int]]:
+        """Retrieve unique indexed segments whose cells touch a box over a time window."""
+        with self._lock.reading():
+            return self.index.query_region(lo, hi, start_time, end_time)
+
+    def get(self, drone_id: str) -> Optional[Trajectory]:
+        return self.flights.get(drone_id)
+
+    def __contains__(self, drone_id: str) -> bool:
+        return drone_id in self.flights
+
+    def __iter__(self) -> Iterator[Trajectory]:
+        with self._lock.reading():
+            return iter(list(self.flights.values()))
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def __getstate__(self) -> dict:
+        # Locks and listeners belong to this process; a pickled copy starts with fresh ones
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["listeners"] = []
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = ReadWriteLock()
+
+def as_trajectory(flight: Union[Mission, Trajectory]) -> Trajectory:
+    """Convert a validated mission to its internal trajectory form (no-op for trajectories)."""
+    if isinstance(flight, Trajectory):
+        return flight
+    started = time.perf_counter()
+    trajectory = Trajectory.from_mission(flight)
+    record_stage("timestamp", time.perf_counter() - started)
+    return trajectory
@@ -1,10 +1,24 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from models import Mission, SimulatedFlight, Conflict
-from deconfliction_engine import detect_conflicts
-from config import PORT, DEBUG_MODE
+from deconfliction_engine import detect_conflicts_batch, first_conflict
+from airspace import AirspaceStore
+from config import PORT, DEBUG_MODE, FLIGHTS_FILE, SNAPSHOT_FILE, VIEWPORT_PIXELS, VIEWPORT_PAGE_SIZE, VIEWPORT_MAX_PAGE_SIZE
+from loader import LoadProgress, load_flights_in_background
+from snapshot import load_snapshot
+from cache import ResultCache
+from incremental import AnalysisRegistry, analyze, apply_edits, reanalyze
+from serving import AnalysisExecutor, AnalysisOverloaded, AnalysisTimeout
+from metrics import profile, render_metrics, summarize_profile
+from viewport import flights_in_view, parse_bounds, render_flight, view_tolerance
+from slots import find_departure_slots
+from functools import partial, wraps
+import bisect
+import hashlib
 import json
 import os
+import time
+import uuid
 import logging
 
 # Configure logging
@@ -14,43 +28,319 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
-# Load simulated flights
-try:
-    with open(os.path.join("data", "sample_simulated_flights.json"), "r") as f:
-        SIMULATED_FLIGHTS = [SimulatedFlight(**flight) for flight in json.load(f)]
-    logger.info("Loaded simulated flights successfully")
-except Exception as e:
-    logger.error(f"Failed to load simulated flights: {str(e)}")
-    SIMULATED_FLIGHTS = []
+if SNAPSHOT_FILE and os.path.exists(SNAPSHOT_FILE):
+    # Map a prepared airspace snapshot; nothing needs re-parsing or re-indexing
+    AIRSPACE = load_snapshot(SNAPSHOT_FILE)
+    LOAD_PROGRESS = LoadProgress(SNAPSHOT_FILE)
+    LOAD_PROGRESS.flights_loaded = len(AIRSPACE)
+    LOAD_PROGRESS.bytes_read = LOAD_PROGRESS.total_bytes
+    LOAD_PROGRESS.done = True
+    LOAD_PROGRESS.finished.set()
+else:
+    # Stream simulated flights into the airspace in the background so health checks answer immediately
+    AIRSPACE = AirspaceStore()
+    LOAD_PROGRESS = load_flights_in_background(FLIGHTS_FILE, AIRSPACE)
+
+# Distinguishes this process's airspace generations from those of earlier runs in ETags
+AIRSPACE_EPOCH = uuid.uuid4().hex[:8]
+
+# Repeated analyses of an unchanged mission are served from here until a nearby flight changes
+RESULT_CACHE = ResultCache(AIRSPACE)
+# Full analyses stay addressable by id so an edited mission only re-checks the segments it changed
+ANALYSES = AnalysisRegistry()
+# CPU-bound checks run here, bounded and timed out, so request threads stay free for cheap endpoints
+ANALYSIS_EXECUTOR = AnalysisExecutor(AIRSPACE)
+
+def analysis_response(conflicts):
+    """Build the JSON body describing one mission's analysis result."""
+    return {
+        "status": "conflict" if conflicts else "clear",
+        "conflicts": [c.dict() for c in conflicts] if conflicts else [],
+        "message": "Conflicts detected" if conflicts else "No conflicts detected"
+    }
+
+@app.errorhandler(AnalysisOverloaded)
+def analysis_overloaded(e):
+    logger.warning(f"Rejecting analysis: {str(e)}")
+    return jsonify({"status": "error", "message": str(e)}), 503, {"Retry-After": "1"}
+
+@app.errorhandler(AnalysisTimeout)
+def analysis_timeout(e):
+    logger.warning(f"Analysis timed out: {str(e)}")
+    return jsonify({"status": "error", "message": str(e)}), 504
+
+def requires_loaded_airspace(view):
+    """Answer 503 until the airspace has finished loading, and 500 if the load failed.
+
+    Checking against a partly loaded airspace would report clear for missions whose
+    conflicting flights have simply not been read yet.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not LOAD_PROGRESS.done:
+            return jsonify({"status": "error", "message": "Airspace is still loading",
+                            "airspace_loading": True, "airspace": LOAD_PROGRESS.to_dict()}), 503, {"Retry-After": "1"}
+        if LOAD_PROGRESS.error is not None:
+            # An aborted load leaves a partial airspace, which is no better than a loading one
+            return jsonify({"status": "error", "message": f"Airspace failed to load: {LOAD_PROGRESS.error}",
+                            "airspace_loading": False, "airspace": LOAD_PROGRESS.to_dict()}), 500
+        return view(*args, **kwargs)
+    return wrapper
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    logger.info("Health check requested")
-    return jsonify({"status": "healthy", "message": "Server is running"}), 200
+    logger.debug("Health check requested")
+    return jsonify({"status": "healthy", "message": "Server is running",
+                    "airspace": LOAD_PROGRESS.to_dict(), "analysis": ANALYSIS_EXECUTOR.stats()}), 200
 
 @app.route('/api/analyze-mission', methods=['POST'])
+@requires_loaded_airspace
 def analyze_mission():
     try:
         data = request.get_json()
         mission = Mission(**data["mission"])
-        logger.info(f"Analyzing mission for drone {mission.drone_id}")
-        conflicts = detect_conflicts(mission, SIMULATED_FLIGHTS)
-        response = {
-            "status": "conflict" if conflicts else "clear",
-            "conflicts": [c.dict() for c in conflicts] if conflicts else [],
-            "message": "Conflicts detected" if conflicts else "No conflicts detected"
-        }
-        logger.info(f"Analysis complete: {response['status']}")
+        logger.debug(f"Analyzing mission for drone {mission.drone_id}")
+        started = time.perf_counter()
+        with profile() as collected:
+            if data.get("stop_at_first"):
+                # Early-exit mode: report at most one conflict, returned as soon as it is found
+                def compute():
+                    conflict = ANALYSIS_EXECUTOR.run(first_conflict, mission)
+                    return [conflict] if conflict else []
+                conflicts = RESULT_CACHE.get_or_compute(mission, compute, mode="first")
+            else:
+                analysis = ANALYSES.add(RESULT_CACHE.get_or_compute(mission, lambda: ANALYSIS_EXECUTOR.run(analyze, mission)))
+                conflicts = analysis.conflicts
+        response = analysis_response(conflicts)
+        if not data.get("stop_at_first"):
+            response["analysis_id"] = analysis.analysis_id
+        if data.get("profile"):
+            response["profile"] = dict(summarize_profile(collected), total_ms=(time.perf_counter() - started) * 1000.0)
+        logger.debug(f"Analysis complete: {response['status']}")
         return jsonify(response), 200
+    except (AnalysisOverloaded, AnalysisTimeout):
+        raise
     except Exception as e:
         logger.error(f"Error in analyze_mission: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 400
 
+@app.route('/api/analyze-missions', methods=['POST'])
+@requires_loaded_airspace
+def analyze_missions():
+    try:
+        data = request.get_json()
+        results = [None] * len(data["missions"])
+        missions, positions = [], []
+        for i, mission_data in enumerate(data["missions"]):
+            try:
+                missions.append(Mission(**mission_data))
+                positions.append(i)
+            except Exception as e:
+                results[i] = {"status": "error", "message": str(e)}
+        logger.debug(f"Analyzing batch of {len(missions)} missions")
+        for i, conflicts in zip(positions, ANALYSIS_EXECUTOR.map(partial(detect_conflicts_batch, workers=1), missions)):
+            results[i] = analysis_response(conflicts)
+        logger.debug(f"Batch analysis complete: {len(results)} results")
+        return jsonify({"status": "complete", "results": results}), 200
+    except (AnalysisOverloaded, AnalysisTimeout):
+        raise
+    except Exception as e:
+        logger.error(f"Error in analyze_missions: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+@app.route('/api/find-slots', methods=['POST'])
+@requires_loaded_airspace
+def find_slots():
+    """Conflict-free departure times for a mission within an allowed departure window.
+
+    Body: {"mission": {...}, "departure_window": [earliest, latest] (epoch seconds the mission
+    may start), optional "limit" (slots to return, 0 for all) and "order" ("earliest" or
+    "nearest" to the mission's own start time)}.
+    """
+    try:
+        data = request.get_json()
+        mission = Mission(**data["mission"])
+        earliest, latest = (float(value) for value in data["departure_window"])
+        # Shifts are relative to the filed start; the mission may not be moved before the epoch
+        earliest_shift = max(earliest, 0.0) - mission.start_time
+        latest_shift = latest - mission.start_time
+        logger.debug(f"Searching departure slots for drone {mission.drone_id}")
+        search = partial(find_departure_slots, limit=int(data.get("limit", 1)), order=data.get("order", "earliest"))
+        slots = ANALYSIS_EXECUTOR.run(search, mission, earliest_shift, latest_shift)
+        return jsonify({
+            "status": "found" if slots else "blocked",
+            "slots": [slot.dict() for slot in slots]
+        }), 200
+    except (AnalysisOverloaded, AnalysisTimeout):
+        raise
+    except Exception as e:
+        logger.error(f"Error in find_slots: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+@app.route('/api/analyses/<analysis_id>/edits', methods=['POST'])
+@requires_loaded_airspace
+def edit_analysis(analysis_id):
+    previous = ANALYSES.get(analysis_id)
+    if previous is None:
+        return jsonify({"status": "error", "message": f"Unknown analysis {analysis_id}"}), 404
+    try:
+        data = request.get_json()
+        mission = apply_edits(previous.mission, data["edits"])
+        logger.debug(f"Re-analyzing edited mission for drone {mission.drone_id}")
+        started = time.perf_counter()
+        with profile() as collected:
+            # Writes since the previous analysis only force a full re-check when they landed near the mission
+            unchanged = RESULT_CACHE.unchanged_generation(mission, previous.generation)
+            recheck = partial(reanalyze, unchanged_generation=unchanged)
+            analysis = ANALYSES.add(RESULT_CACHE.get_or_compute(mission, lambda: ANALYSIS_EXECUTOR.run(recheck, previous, mission)))
+        response = analysis_response(analysis.conflicts)
+        response.update({
+            "analysis_id": analysis.analysis_id,
+            "mission": analysis.mission.dict(),
+            "reused_segments": analysis.reused_segments,
+            "recomputed_segments": analysis.recomputed_segments
+        })
+        if data.get("profile"):
+            response["profile"] = dict(summarize_profile(collected), total_ms=(time.perf_counter() - started) * 1000.0)
+        return jsonify(response), 200
+    except (AnalysisOverloaded, AnalysisTimeout):
+        raise
+    except Exception as e:
+        logger.error(f"Error in edit_analysis: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(RESULT_CACHE.stats()), 200
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    cache, executor = RESULT_CACHE.stats(), ANALYSIS_EXECUTOR.stats()
+    body = render_metrics([
+        ("deconfliction_cache_hits_total", "counter", "Analyses served from the result cache.", cache["hits"]),
+        ("deconfliction_cache_misses_total", "counter", "Analyses computed on a cache miss.", cache["misses"]),
+        ("deconfliction_cache_evictions_total", "counter", "Cache entries evicted by the LRU bound.", cache["evictions"]),
+        ("deconfliction_cache_invalidations_total", "counter", "Cache entries invalidated by airspace writes.",
+         cache["invalidations"]),
+        ("deconfliction_cache_entries", "gauge", "Results currently cached.", cache["entries"]),
+        ("deconfliction_airspace_flights", "gauge", "Flights registered in the airspace.", len(AIRSPACE)),
+        ("deconfliction_airspace_segments", "gauge", "Segments indexed in the airspace.", AIRSPACE.segment_count),
+        ("deconfliction_airspace_generation", "counter", "Airspace writes since startup.", AIRSPACE.generation),
+        ("deconfliction_grid_size_meters", "gauge", "Cell size of the airspace index.", AIRSPACE.index.grid_size),
+        ("deconfliction_analyses_pending", "gauge", "Analyses running or queued.", executor["pending"])
+    ])
+    return app.response_class(body, mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/flights', methods=['POST'])
+def file_flight():
+    try:
+        flight = SimulatedFlight(**request.get_json())
+        if flight.drone_id in AIRSPACE:
+            return jsonify({"status": "error", "message": f"Flight {flight.drone_id} is already registered"}), 409
+        logger.info(f"Filing flight {flight.drone_id}")
+        trajectory = AIRSPACE.add_flight(flight)
+        return jsonify(trajectory.to_dict()), 201
+    except ValueError as e:
+        # A concurrent filing of the same drone id lost the race
+        status = 409 if "already registered" in str(e) else 400
+        logger.error(f"Error in file_flight: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), status
+    except Exception as e:
+        logger.error(f"Error in file_flight: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+@app.route('/api/flights', methods=['GET'])
+def view_flights():
+    """Flights inside a viewport and time window, simplified for display.
+
+    Query arguments: min_x/min_y/min_z and max_x/max_y/max_z (meters), start/end (epoch
+    seconds), tolerance (meters) or pixels (screen width to derive it from), limit and after
+    (drone id cursor) for paging, and format=ndjson to stream one flight per line (unpaged
+    unless a limit is given).
+    """
+    try:
+        args = request.args
+        lo, hi = parse_bounds(args, "min", "-inf"), parse_bounds(args, "max", "inf")
+        start_time, end_time = float(args.get("start", "-inf")), float(args.get("end", "inf"))
+        after = args.get("after")
+        ndjson = args.get("format") == "ndjson"
+        if "limit" in args:
+            limit = min(int(args["limit"]), VIEWPORT_MAX_PAGE_SIZE)
+        else:
+            limit = None if ndjson else VIEWPORT_PAGE_SIZE  # A stream is not held in memory, so it is unpaged
+
+        # The airspace generation identifies its content; unchanged airspace is answered with 304
+        query = json.dumps(sorted(args.items(multi=True)))
+        etag = hashlib.sha1(f"{AIRSPACE_EPOCH}:{AIRSPACE.generation}:{query}".encode("utf-8")).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        flights = flights_in_view(AIRSPACE, lo, hi, start_time, end_time)
+        if "tolerance" in args:
+            tolerance = float(args["tolerance"])
+        else:
+            tolerance = view_tolerance(lo, hi, flights, int(args.get("pixels", VIEWPORT_PIXELS)))
+        total = len(flights)
+        if after is not None:
+            flights = flights[bisect.bisect_right([flight.drone_id for flight in flights], after):]
+        page = flights if limit is None else flights[:limit]
+        more = len(flights) > len(page)
+        next_cursor = page[-1].drone_id if more else None
+
+        if ndjson:
+            def lines():
+                for flight in page:
+                    yield json.dumps(render_flight(flight, tolerance, start_time, end_time)) + "\n"
+            response = Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+            if next_cursor is not None:
+                response.headers["X-Next-Cursor"] = next_cursor
+        else:
+            response = jsonify({
+                "flights": [render_flight(flight, tolerance, start_time, end_time) for flight in page],
+                "total": total,
+                "next_cursor": next_cursor,
+                "tolerance": tolerance
+            })
+        response.headers["X-Total-Count"] = str(total)
+        response.headers["Cache-Control"] = "no-cache"  # Always revalidate with the ETag
+        response.set_etag(etag)
+        return response
+    except Exception as e:
+        logger.error(f"Error in view_flights: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+@app.route('/api/flights/<drone_id>', methods=['PUT'])
+def amend_flight(drone_id):
+    try:
+        data = dict(request.get_json())
+        if data.setdefault("drone_id", drone_id) != drone_id:
+            return jsonify({"status": "error", "message": "drone_id does not match the flight being amended"}), 400
+        flight = SimulatedFlight(**data)
+        logger.info(f"Amending flight {drone_id}")
+        trajectory = AIRSPACE.update_flight(flight)
+        return jsonify(trajectory.to_dict()), 200
+    except KeyError:
+        return jsonify({"status": "error", "message": f"Flight {drone_id} is not registered"}), 404
+    except Exception as e:
+        logger.error(f"Error in amend_flight: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+@app.route('/api/flights/<drone_id>', methods=['DELETE'])
+def cancel_flight(drone_id):
+    try:
+        logger.info(f"Cancelling flight {drone_id}")
+        AIRSPACE.remove_flight(drone_id)
+        return jsonify({"status": "cancelled", "drone_id": drone_id}), 200
+    except KeyError:
+        return jsonify({"status": "error", "message": f"Flight {drone_id} is not registered"}), 404
+
 @app.route('/api/simulated-flights', methods=['GET'])
 def get_simulated_flights():
     try:
         logger.info("Fetching simulated flights")
-        return jsonify([flight.dict() for flight in SIMULATED_FLIGHTS]), 200
+        return jsonify([flight.to_dict() for flight in AIRSPACE]), 200
     except Exception as e:
         logger.error(f"Error in get_simulated_flights: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
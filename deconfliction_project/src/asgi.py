@@ -0,0 +1,27 @@
+"""Production entry point: serves the Flask app behind an ASGI event loop.
+
+The event loop accepts and holds many concurrent connections; each request is handed to a
+bounded pool of HTTP_THREADS request threads, and CPU-bound analyses are offloaded again to
+the app's AnalysisExecutor with backpressure and timeouts. Run a single server process (the
+airspace lives in memory and takes live updates), e.g.:
+
+    cd src && uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+or simply python src/asgi.py. Analyses are spread across every core by the default
+ANALYSIS_EXECUTOR = "process" in config.py.
+"""
+from a2wsgi import WSGIMiddleware
+from app import app
+from config import PORT, HTTP_THREADS
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+application = WSGIMiddleware(app, workers=HTTP_THREADS)
+
+if __name__ == "__main__":
+    import uvicorn
+    logger.info(f"Starting ASGI server on port {PORT}")
+    uvicorn.run(application, host="0.0.0.0", port=PORT)
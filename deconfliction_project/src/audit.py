@@ -0,0 +1,46 @@
+"""Audit a flight schedule for pairwise conflicts.
+
+Usage: python src/audit.py data/sample_simulated_flights.json -o conflict_report.json
+"""
+from models import SimulatedFlight
+from deconfliction_engine import detect_all_conflicts
+from loader import iter_flight_records
+import argparse
+import json
+import logging
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report every conflicting pair of flights in a schedule.")
+    parser.add_argument("flights", help="JSON array or JSON Lines (.jsonl/.ndjson) file of flights")
+    parser.add_argument("-o", "--output", help="Where to write the conflict report (default: stdout)")
+    parser.add_argument("--grid-size", type=float, default=None, help="Grid cell size in meters (default: derived)")
+    args = parser.parse_args(argv)
+
+    flights = [SimulatedFlight(**record) for record in iter_flight_records(args.flights)]
+    logger.info(f"Loaded {len(flights)} flights from {args.flights}")
+
+    started = time.perf_counter()
+    conflicts = detect_all_conflicts(flights, grid_size=args.grid_size)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "flights": len(flights),
+        "conflicting_pairs": len(conflicts),
+        "elapsed_seconds": round(elapsed, 3),
+        "conflicts": [c.dict() for c in conflicts]
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Wrote {len(conflicts)} conflicting pairs to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
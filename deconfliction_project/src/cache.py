@@ -0,0 +1,137 @@
+from typing import Callable, List, Optional, Union
+from models import Mission
+from trajectory import Trajectory
+from airspace import AirspaceStore
+from config import CACHE_SIZE
+from collections import OrderedDict, deque
+import hashlib
+import json
+import threading
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Number of recent airspace changes remembered to validate results computed during a write
+CHANGE_HISTORY = 256
+
+class CacheEntry:
+    __slots__ = ("result", "lo", "hi", "start_time", "end_time", "generation")
+
+    def __init__(self, result, lo, hi, start_time, end_time, generation):
+        self.result = result
+        self.lo = lo
+        self.hi = hi
+        self.start_time = start_time
+        self.end_time = end_time
+        self.generation = generation
+
+    def overlaps(self, lo, hi, start_time, end_time) -> bool:
+        return (start_time <= self.end_time and self.start_time <= end_time
+                and bool((lo <= self.hi).all()) and bool((self.lo <= hi).all()))
+
+class ResultCache:
+    """Bounded LRU cache of analysis results in front of the engine.
+
+    Keys are a canonical hash of the mission content (drone id, waypoints, time window,
+    speed, buffer) and the query mode. Each entry remembers the mission's buffered space-time
+    box; when the airspace adds or removes a flight, only entries whose box overlaps the
+    flight's buffered box are invalidated. Results computed while a relevant write landed
+    are not stored, so a stale result is never served.
+    """
+    def __init__(self, airspace: AirspaceStore, max_entries: int = CACHE_SIZE):
+        self.airspace = airspace
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.changes = deque(maxlen=CHANGE_HISTORY)  # (generation, lo, hi, start_time, end_time)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        airspace.add_listener(self._on_flight_changed)
+
+    @staticmethod
+    def mission_key(mission: Union[Mission, Trajectory], mode: str = "full") -> str:
+        """Canonical content hash of a mission and query mode."""
+        if isinstance(mission, Trajectory):
+            points = mission.points.tolist()
+        else:
+            points = [[wp.x, wp.y, wp.z] for wp in mission.waypoints]
+        payload = json.dumps([mode, mission.drone_id, points, mission.start_time, mission.end_time,
+                              mission.speed, mission.safety_buffer], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _on_flight_changed(self, trajectory: Trajectory):
+        lo, hi, start_time, end_time = trajectory.bounds(trajectory.safety_buffer)
+        with self._lock:
+            self.changes.append((self.airspace.generation, lo, hi, start_time, end_time))
+            stale = [key for key, entry in self.entries.items() if entry.overlaps(lo, hi, start_time, end_time)]
+            for key in stale:
+                del self.entries[key]
+            self.invalidations += len(stale)
+
+    def _changed_since(self, generation: int, entry: CacheEntry) -> bool:
+        """Whether any write after the given generation could affect the entry."""
+        if self.airspace.generation == generation:
+            return False
+        if not self.changes or self.changes[0][0] > generation + 1:
+            return True  # History no longer covers the whole interval
+        return any(g > generation and entry.overlaps(lo, hi, t0, t1) for g, lo, hi, t0, t1 in self.changes)
+
+    def unchanged_generation(self, mission: Union[Mission, Trajectory], generation: int) -> Optional[int]:
+        """Current airspace generation if no write since the given one touched the mission's buffered box.
+
+        Returns None when a write overlapped it or the change history no longer reaches back that far.
+        """
+        trajectory = mission if isinstance(mission, Trajectory) else Trajectory.from_mission(mission)
+        lo, hi, start_time, end_time = trajectory.bounds(trajectory.safety_buffer)
+        entry = CacheEntry(None, lo, hi, start_time, end_time, generation)
+        # Writers log their change under the write lock, so a read lock pairs the generation with its history
+        with self.airspace.reading(), self._lock:
+            return None if self._changed_since(generation, entry) else self.airspace.generation
+
+    def get_or_compute(self, mission: Union[Mission, Trajectory], compute: Callable[[], List],
+                       mode: str = "full"):
+        """Return the cached result for a mission, computing and storing it on a miss."""
+        key = self.mission_key(mission, mode)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+            self.misses += 1
+            generation = self.airspace.generation
+
+        result = compute()
+        trajectory = mission if isinstance(mission, Trajectory) else Trajectory.from_mission(mission)
+        lo, hi, start_time, end_time = trajectory.bounds(trajectory.safety_buffer)
+        entry = CacheEntry(result, lo, hi, start_time, end_time, generation)
+        with self._lock:
+            if not self._changed_since(generation, entry):
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "airspace_generation": self.airspace.generation
+            }
@@ -1,2 +1,27 @@
 PORT = 5000
-DEBUG_MODE = True
\ No newline at end of file
+DEBUG_MODE = True
+GRID_SIZE = None  # Cell size in meters; None derives it from the loaded flights
+TIME_BUCKET_SIZE = 300.0
+BATCH_WORKERS = None  # Process pool size for batch analysis; None uses every core
+BATCH_MIN_PARALLEL = 8  # Smaller batches are analyzed in the request process
+SWEEP_PAIR_CHUNK = 100000  # Candidate pairs buffered before each narrow-phase pass in all-pairs mode
+FLIGHTS_FILE = "data/sample_simulated_flights.json"  # JSON array or JSON Lines (.jsonl/.ndjson)
+LOAD_CHUNK_SIZE = 1 << 16  # Bytes read per step when streaming a JSON array
+LOAD_PROGRESS_EVERY = 1000  # Flights between progress reports
+LOAD_GRID_SAMPLE = 1000  # Flights read before the first insert to size an auto-tuned grid
+SNAPSHOT_FILE = None  # Binary airspace snapshot to map at startup instead of loading FLIGHTS_FILE
+FIRST_CONFLICT_CHUNK = 32  # Candidate pairs checked per vectorized step in early-exit mode
+CACHE_SIZE = 1024  # Analysis results kept in the LRU cache
+ANALYSIS_HANDLES = 4096  # Analyses kept addressable by id for incremental edits
+ANALYSIS_EXECUTOR = "process"  # "process" forks workers to use every core; "thread" shares the live airspace under the GIL
+ANALYSIS_WORKERS = None  # Concurrent analyses (None = one per CPU core)
+ANALYSIS_QUEUE_SIZE = 64  # Analyses admitted at once (running or queued) before requests get 503
+ANALYSIS_TIMEOUT = 30.0  # Seconds a request waits for its analysis before getting 504
+ANALYSIS_DELTA_LIMIT = 256  # Airspace writes shipped to process workers with each analysis before they are re-forked
+ANALYSIS_REFRESH_INTERVAL = 5.0  # Minimum seconds between re-forks of the process workers
+HTTP_THREADS = 96  # Request threads behind the ASGI server; keep above ANALYSIS_QUEUE_SIZE
+METRICS_ENABLED = True  # Record stage timings and candidate counts for /api/metrics
+VIEWPORT_PIXELS = 1000  # Screen width assumed when deriving the simplification tolerance from a viewport
+VIEWPORT_PAGE_SIZE = 500  # Flights per page of GET /api/flights
+VIEWPORT_MAX_PAGE_SIZE = 5000  # Largest page a client may request
+SLOT_TOLERANCE = 0.01  # Seconds of precision on departure-slot boundaries (slots are shrunk by this much)
\ No newline at end of file
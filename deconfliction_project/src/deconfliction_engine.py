@@ -1,202 +1,350 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from models import Mission, SimulatedFlight, Conflict, Waypoint
-from utils import interpolate_position
+from trajectory import Trajectory, SEGMENT_COLUMNS
+from spatial_index import ActiveSegmentGrid, suggest_grid_size
+from airspace import AirspaceStore, ReadWriteLock, as_trajectory
+from snapshot import load_snapshot
+from metrics import record_stage, record_candidates
+from config import BATCH_WORKERS, BATCH_MIN_PARALLEL, GRID_SIZE, SWEEP_PAIR_CHUNK, FIRST_CONFLICT_CHUNK
+from functools import partial
+import heapq
+import multiprocessing
 import numpy as np
-from collections import defaultdict
+import os
+import time
 import logging
 
 # Configure logging for debugging and performance tracking
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class SpatialIndex:
-    """Grid-based spatial index to optimize collision detection by grouping segments into cells."""
-    def __init__(self, grid_size: float = 50.0):
-        self.grid_size = grid_size
-        self.cells = defaultdict(list)
-
-    def add_segment(self, mission: Mission, segment_idx: int):
-        """Add a mission segment to relevant grid cells based on its spatial bounds."""
-        wp1, wp2 = mission.waypoints[segment_idx], mission.waypoints[segment_idx + 1]
-        min_x, max_x = min(wp1.x, wp2.x), max(wp1.x, wp2.x)
-        min_y, max_y = min(wp1.y, wp2.y), max(wp1.y, wp2.y)
-        min_z, max_z = min(wp1.z, wp2.z), max(wp1.z, wp2.z)
-        for x in range(int(min_x // self.grid_size), int(max_x // self.grid_size) + 1):
-            for y in range(int(min_y // self.grid_size), int(max_y // self.grid_size) + 1):
-                for z in range(int(min_z // self.grid_size), int(max_z // self.grid_size) + 1):
-                    self.cells[(x, y, z)].append((mission, segment_idx))
-
-    def add_static_waypoint(self, mission: Mission):
-        """Add a static waypoint to the spatial index for single-waypoint missions."""
-        wp = mission.waypoints[0]
-        x, y, z = int(wp.x // self.grid_size), int(wp.y // self.grid_size), int(wp.z // self.grid_size)
-        self.cells[(x, y, z)].append((mission, None))  # None indicates static waypoint
-
-    def query(self, mission: Mission, segment_idx: int) -> List[Tuple[Mission, int]]:
-        """Retrieve segments or static waypoints in nearby grid cells."""
-        wp1, wp2 = mission.waypoints[segment_idx], mission.waypoints[segment_idx + 1]
-        min_x, max_x = min(wp1.x, wp2.x), max(wp1.x, wp2.x)
-        min_y, max_y = min(wp1.y, wp2.y), max(wp1.y, wp2.y)
-        min_z, max_z = min(wp1.z, wp2.z), max(wp1.z, wp2.z)
-        nearby = []
-        for x in range(int(min_x // self.grid_size), int(max_x // self.grid_size) + 1):
-            for y in range(int(min_y // self.grid_size), int(max_y // self.grid_size) + 1):
-                for z in range(int(min_z // self.grid_size), int(max_z // self.grid_size) + 1):
-                    nearby.extend(self.cells.get((x, y, z), []))
-        return nearby
-
-    def query_static(self, wp: Waypoint) -> List[Tuple[Mission, Optional[int]]]:
-        """Query nearby static waypoints or segments for a static waypoint."""
-        x, y, z = int(wp.x // self.grid_size), int(wp.y // self.grid_size), int(wp.z // self.grid_size)
-        return self.cells.get((x, y, z), [])
-
-def detect_conflicts(primary_mission: Mission, other_flights: List[SimulatedFlight]) -> List[Conflict]:
-    """Detect spatial-temporal conflicts between primary mission and other flights."""
+def segment_rows(entries: List[Tuple[Trajectory, int]]) -> np.ndarray:
+    """Gather the (n, 9) segment rows (start, end, t0, t1, buffer) of the given index entries."""
+    if not entries:
+        return np.empty((0, len(SEGMENT_COLUMNS)), dtype=np.float64)
+    return np.array([trajectory.segments[segment_idx] for trajectory, segment_idx in entries])
+
+def batch_segment_conflicts(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Closest approach for every row pair of two aligned segment arrays in one vectorized pass.
+
+    Returns (conflict mask, time of closest approach, position of segment a at that time, distance).
+    A pair conflicts when the time windows overlap and the distance drops below the summed buffers.
+    """
+    t_start = np.maximum(a[:, 6], b[:, 6])
+    t_end = np.minimum(a[:, 7], b[:, 7])
+    overlap = t_start < t_end
+
+    # Velocity of each segment; zero-duration segments are treated as stationary
+    a_duration = a[:, 7] - a[:, 6]
+    b_duration = b[:, 7] - b[:, 6]
+    v1 = (a[:, 3:6] - a[:, 0:3]) / np.where(a_duration > 0, a_duration, 1.0)[:, None]
+    v2 = (b[:, 3:6] - b[:, 0:3]) / np.where(b_duration > 0, b_duration, 1.0)[:, None]
+
+    # Positions at the start of the shared window, then minimise |w + vr * tau| over it
+    pos1 = a[:, 0:3] + v1 * (t_start - a[:, 6])[:, None]
+    pos2 = b[:, 0:3] + v2 * (t_start - b[:, 6])[:, None]
+    w = pos1 - pos2
+    vr = v1 - v2
+    vr_dot_vr = np.einsum('ij,ij->i', vr, vr)
+    w_dot_vr = np.einsum('ij,ij->i', w, vr)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = np.where(vr_dot_vr > 0, -w_dot_vr / vr_dot_vr, 0.0)  # Parallel paths keep a constant distance
+    tau = np.clip(tau, 0.0, np.maximum(t_end - t_start, 0.0))
+
+    separation = w + vr * tau[:, None]
+    distances = np.sqrt(np.einsum('ij,ij->i', separation, separation))
+    mask = overlap & (distances < a[:, 8] + b[:, 8])
+    return mask, t_start + tau, pos1 + v1 * tau[:, None], distances
+
+def detect_segment_conflicts(primary_mission: Union[Mission, Trajectory],
+                             other_flights: Union[AirspaceStore, List[SimulatedFlight]],
+                             segment_indices: Optional[Sequence[int]] = None) -> Dict[int, List[Conflict]]:
+    """Detect conflicts for selected primary segments, grouped by segment index.
+
+    Every requested segment gets an entry, empty when it is clear. All segments are checked
+    when segment_indices is None.
+    """
     try:
-        # Assign timestamps to waypoints
-        primary_mission.assign_timestamps()
-        spatial_index = SpatialIndex(grid_size=50.0)
-        conflicts = []
-
-        # Index other flights' segments or static waypoints
-        for flight in other_flights:
-            flight.assign_timestamps()
-            if len(flight.waypoints) == 1:
-                spatial_index.add_static_waypoint(flight)
-            else:
-                for i in range(len(flight.waypoints) - 1):
-                    spatial_index.add_segment(flight, i)
-
-        # Handle single-waypoint primary mission
-        if len(primary_mission.waypoints) == 1:
-            wp1 = primary_mission.waypoints[0]
-            nearby = spatial_index.query_static(wp1)
-            for other_mission, segment_idx in nearby:
-                if other_mission.drone_id == primary_mission.drone_id:
-                    continue
-                if segment_idx is None:  # Static vs static
-                    conflict = check_static_collision(wp1, other_mission.waypoints[0],
-                                                    primary_mission, other_mission)
-                else:  # Static vs segment
-                    wp3, wp4 = other_mission.waypoints[segment_idx], other_mission.waypoints[segment_idx + 1]
-                    conflict = check_static_vs_segment_collision(wp1, wp3, wp4,
-                                                               primary_mission.safety_buffer + other_mission.safety_buffer)
-                if conflict:
-                    conflicts.append(conflict)
+        # Timestamp the primary mission into its array form; the validated model is left untouched
+        primary = as_trajectory(primary_mission)
+        if isinstance(other_flights, AirspaceStore):
+            airspace = other_flights
         else:
-            # Check primary mission segments
-            for i in range(len(primary_mission.waypoints) - 1):
-                wp1, wp2 = primary_mission.waypoints[i], primary_mission.waypoints[i + 1]
-                nearby = spatial_index.query(primary_mission, i)
-                for other_mission, segment_idx in nearby:
-                    if other_mission.drone_id == primary_mission.drone_id:
-                        continue
-                    if segment_idx is None:  # Segment vs static
-                        conflict = check_static_vs_segment_collision(other_mission.waypoints[0], wp1, wp2,
-                                                                   primary_mission.safety_buffer + other_mission.safety_buffer)
-                    else:  # Segment vs segment
-                        wp3, wp4 = other_mission.waypoints[segment_idx], other_mission.waypoints[segment_idx + 1]
-                        conflict = check_segment_collision(wp1, wp2, wp3, wp4,
-                                                         primary_mission.safety_buffer + other_mission.safety_buffer)
-                    if conflict:
-                        conflicts.append(conflict)
-
-        logger.info(f"Detected {len(conflicts)} conflicts for mission {primary_mission.drone_id}")
+            airspace = AirspaceStore.from_flights(other_flights)
+        if segment_indices is None:
+            segment_indices = range(len(primary.segments))
+
+        # Broad phase: pair each primary segment (a static waypoint is a single held segment) with its candidates
+        # The whole broad phase sees one consistent airspace; candidate rows are copied out before release
+        started = time.perf_counter()
+        primary_idx, candidate_entries = [], []
+        with airspace.reading():
+            for i in segment_indices:
+                for entry in airspace.query(primary.segments[i].tolist(), primary.safety_buffer):
+                    if entry[0].drone_id != primary.drone_id:
+                        primary_idx.append(i)
+                        candidate_entries.append(entry)
+            candidates = segment_rows(candidate_entries) if candidate_entries else None
+            pairs_considered = len(segment_indices) * airspace.segment_count
+        narrow_started = time.perf_counter()
+        record_stage("broad_phase", narrow_started - started)
+        record_candidates(len(candidate_entries), pairs_considered)
+
+        # Narrow phase over all candidate pairs at once
+        conflicts = {i: [] for i in segment_indices}
+        if candidate_entries:
+            mask, times, locations, distances = batch_segment_conflicts(primary.segments[primary_idx], candidates)
+            for k in np.flatnonzero(mask):
+                conflicts[primary_idx[k]].append(Conflict(
+                    time=float(times[k]),
+                    location=tuple(float(c) for c in locations[k]),
+                    involved_flights=[primary.drone_id, candidate_entries[k][0].drone_id],
+                    distance=float(distances[k])
+                ))
+        record_stage("narrow_phase", time.perf_counter() - narrow_started)
+        return conflicts
+    except Exception as e:
+        logger.error(f"Error in detect_segment_conflicts: {str(e)}")
+        raise
+
+def detect_conflicts(primary_mission: Union[Mission, Trajectory],
+                     other_flights: Union[AirspaceStore, List[SimulatedFlight]]) -> List[Conflict]:
+    """Detect spatial-temporal conflicts between primary mission and other flights.
+
+    Pass a long-lived AirspaceStore to avoid re-indexing the airspace on every call;
+    a plain list of flights is indexed into a temporary store. Candidate pairs from the
+    index are checked together by the vectorized narrow phase.
+    """
+    try:
+        by_segment = detect_segment_conflicts(primary_mission, other_flights)
+        conflicts = [conflict for segment in by_segment.values() for conflict in segment]
+        logger.debug(f"Detected {len(conflicts)} conflicts for mission {primary_mission.drone_id}")
         return conflicts
     except Exception as e:
         logger.error(f"Error in detect_conflicts: {str(e)}")
         raise
 
-def check_static_collision(wp1: Waypoint, wp2: Waypoint, mission1: Mission, mission2: Mission) -> Optional[Conflict]:
-    """Check for collision between two static waypoints."""
+def window_gap(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Lower bound on the distance between paired segments over their shared time window.
+
+    Both segments are clipped to the overlap and the gap between the clipped bounding boxes
+    is returned; pairs without a time overlap get infinity.
+    """
+    t_start = np.maximum(a[:, 6], b[:, 6])
+    t_end = np.minimum(a[:, 7], b[:, 7])
+
+    def clipped_box(rows):
+        duration = rows[:, 7] - rows[:, 6]
+        safe = np.where(duration > 0, duration, 1.0)
+        f0 = np.clip((t_start - rows[:, 6]) / safe, 0.0, 1.0)[:, None]
+        f1 = np.clip((t_end - rows[:, 6]) / safe, 0.0, 1.0)[:, None]
+        p0 = rows[:, 0:3] + f0 * (rows[:, 3:6] - rows[:, 0:3])
+        p1 = rows[:, 0:3] + f1 * (rows[:, 3:6] - rows[:, 0:3])
+        return np.minimum(p0, p1), np.maximum(p0, p1)
+
+    a_lo, a_hi = clipped_box(a)
+    b_lo, b_hi = clipped_box(b)
+    gap = np.maximum(0.0, np.maximum(b_lo - a_hi, a_lo - b_hi))
+    return np.where(t_start < t_end, np.sqrt(np.einsum('ij,ij->i', gap, gap)), np.inf)
+
+def first_conflict(primary_mission: Union[Mission, Trajectory],
+                   other_flights: Union[AirspaceStore, List[SimulatedFlight]]) -> Optional[Conflict]:
+    """Return one conflict for the mission as soon as it is found, or None if the mission is clear.
+
+    Primary segments are checked one at a time. Within a segment, candidates that cannot come
+    within the combined buffer during their shared window are dropped and the rest are checked
+    closest-first in small vectorized chunks, stopping at the first violation.
+    """
     try:
-        # Check if time windows overlap
-        t_start = max(mission1.start_time, mission2.start_time)
-        t_end = min(mission1.end_time, mission2.end_time)
-        if t_start >= t_end:
-            return None
-
-        # Calculate distance between static waypoints
-        dist = wp1.distance_to(wp2)
-        min_safe_distance = mission1.safety_buffer + mission2.safety_buffer
-        if dist < min_safe_distance:
-            return Conflict(
-                time=t_start,
-                location=(wp1.x, wp1.y, wp1.z),
-                involved_flights=[mission1.drone_id, mission2.drone_id],
-                distance=dist
-            )
-        return None
+        primary = as_trajectory(primary_mission)
+        if isinstance(other_flights, AirspaceStore):
+            airspace = other_flights
+        else:
+            airspace = AirspaceStore.from_flights(other_flights)
+
+        # Broad and narrow work interleave here, so their times are accumulated and recorded once
+        broad_seconds = narrow_seconds = 0.0
+        candidate_count = pairs_considered = 0
+        conflict = None
+        with airspace.reading():
+            for i, row in enumerate(primary.segments.tolist()):
+                pairs_considered += airspace.segment_count
+                started = time.perf_counter()
+                entries = [entry for entry in airspace.query(row, primary.safety_buffer)
+                           if entry[0].drone_id != primary.drone_id]
+                candidates = segment_rows(entries)
+                narrow_started = time.perf_counter()
+                broad_seconds += narrow_started - started
+                candidate_count += len(entries)
+                if not entries:
+                    continue
+                primaries = np.repeat(primary.segments[i:i + 1], len(entries), axis=0)
+                gaps = window_gap(primaries, candidates)
+                order = np.argsort(gaps, kind='stable')
+                order = order[gaps[order] < primaries[order, 8] + candidates[order, 8]]
+                for start in range(0, len(order), FIRST_CONFLICT_CHUNK):
+                    chunk = order[start:start + FIRST_CONFLICT_CHUNK]
+                    mask, times, locations, distances = batch_segment_conflicts(primaries[chunk], candidates[chunk])
+                    hits = np.flatnonzero(mask)
+                    if len(hits):
+                        k, entry = hits[0], entries[chunk[hits[0]]]
+                        conflict = Conflict(time=float(times[k]), location=tuple(float(c) for c in locations[k]),
+                                            involved_flights=[primary.drone_id, entry[0].drone_id],
+                                            distance=float(distances[k]))
+                        break
+                narrow_seconds += time.perf_counter() - narrow_started
+                if conflict is not None:
+                    break
+        record_stage("broad_phase", broad_seconds)
+        record_stage("narrow_phase", narrow_seconds)
+        record_candidates(candidate_count, pairs_considered)
+        return conflict
     except Exception as e:
-        logger.error(f"Error in check_static_collision: {str(e)}")
+        logger.error(f"Error in first_conflict: {str(e)}")
         raise
 
-def check_static_vs_segment_collision(static_wp: Waypoint, wp1: Waypoint, wp2: Waypoint, min_safe_distance: float) -> Optional[Conflict]:
-    """Check for collision between a static waypoint and a moving segment."""
+def is_clear(primary_mission: Union[Mission, Trajectory],
+             other_flights: Union[AirspaceStore, List[SimulatedFlight]]) -> bool:
+    """Yes/no deconfliction check that stops at the first violation."""
+    return first_conflict(primary_mission, other_flights) is None
+
+# Read-only airspace snapshot installed in each batch worker process, and the generation it is at
+_worker_airspace: Optional[AirspaceStore] = None
+_worker_generation = 0
+
+def _init_batch_worker(airspace: Union[AirspaceStore, str], generation: Optional[int] = None):
+    global _worker_airspace, _worker_generation
+    _worker_airspace = load_snapshot(airspace) if isinstance(airspace, str) else airspace
+    # A forked worker inherits the parent's lock mid-read and its listeners; start afresh
+    _worker_airspace._lock = ReadWriteLock()
+    _worker_airspace.listeners = []
+    _worker_generation = _worker_airspace.generation if generation is None else generation
+
+def _sync_worker(generation: int, changes: List[Tuple[int, Trajectory, bool]]):
+    """Replay the airspace writes this worker has not seen, bringing it up to the given generation."""
+    global _worker_generation
+    for change_generation, trajectory, added in changes:
+        if change_generation <= _worker_generation:
+            continue
+        if trajectory.drone_id in _worker_airspace:
+            _worker_airspace.remove_flight(trajectory.drone_id)
+        if added:
+            _worker_airspace.add_flight(trajectory)
+        _worker_generation = change_generation
+    _worker_generation = max(_worker_generation, generation)
+
+def detect_conflicts_batch(missions: List[Union[Mission, Trajectory]],
+                           other_flights: Union[AirspaceStore, List[SimulatedFlight]],
+                           workers: Optional[int] = None) -> List[List[Conflict]]:
+    """Detect conflicts for many missions against one airspace, returning results in input order.
+
+    Large batches are sharded across a long-lived process pool (see serving.batch_executor)
+    whose workers share the airspace as a read-only snapshot: a store mapped from an
+    unmodified snapshot file is re-mapped by each worker, otherwise it is inherited
+    copy-on-write where fork is available and pickled once per worker elsewhere. Small
+    batches or workers=1 run in the calling process.
+    """
     try:
-        # Check time overlap
-        t_start = max(static_wp.timestamp, wp1.timestamp)
-        t_end = min(static_wp.timestamp, wp2.timestamp)
-        if t_start >= t_end:
-            return None
-
-        # Interpolate segment position at static waypoint's timestamp
-        t = (static_wp.timestamp - wp1.timestamp) / (wp2.timestamp - wp1.timestamp) if wp2.timestamp != wp1.timestamp else 0
-        segment_pos = Waypoint(
-            x=wp1.x + t * (wp2.x - wp1.x),
-            y=wp1.y + t * (wp2.y - wp1.y),
-            z=wp1.z + t * (wp2.z - wp1.z),
-            timestamp=static_wp.timestamp
-        )
-        dist = static_wp.distance_to(segment_pos)
-        if dist < min_safe_distance:
-            return Conflict(
-                time=static_wp.timestamp,
-                location=(static_wp.x, static_wp.y, static_wp.z),
-                involved_flights=["primary", "other"],
-                distance=dist
-            )
-        return None
+        if isinstance(other_flights, AirspaceStore):
+            airspace = other_flights
+        else:
+            airspace = AirspaceStore.from_flights(other_flights)
+        trajectories = [as_trajectory(mission) for mission in missions]
+        workers = min(workers or BATCH_WORKERS or os.cpu_count() or 1, len(trajectories))
+        if multiprocessing.current_process().daemon:
+            workers = 1  # Pool workers cannot start pools of their own
+        if workers <= 1 or len(trajectories) < BATCH_MIN_PARALLEL:
+            # Every mission in the batch is checked against the same airspace state
+            with airspace.reading():
+                return [detect_conflicts(trajectory, airspace) for trajectory in trajectories]
+
+        from serving import batch_executor  # serving builds on this module
+        logger.info(f"Analyzing {len(trajectories)} missions across {workers} worker processes")
+        return batch_executor(airspace, workers).map(partial(detect_conflicts_batch, workers=1), trajectories)
     except Exception as e:
-        logger.error(f"Error in check_static_vs_segment_collision: {str(e)}")
+        logger.error(f"Error in detect_conflicts_batch: {str(e)}")
+        raise
+
+def detect_all_conflicts(flights: List[Union[Mission, Trajectory]],
+                         grid_size: Optional[float] = GRID_SIZE) -> List[Conflict]:
+    """Audit a whole schedule for pairwise conflicts, reporting each conflicting flight pair once.
+
+    Segments are swept in order of start time while an active set holds those still airborne.
+    Each new segment is only compared with active segments found through a spatial grid over
+    the active set, and candidate pairs are resolved in chunks by the vectorized narrow phase.
+    The earliest conflict of each flight pair is reported.
+    """
+    try:
+        trajectories = [as_trajectory(flight) for flight in flights]
+        if not trajectories:
+            return []
+        grid = ActiveSegmentGrid(grid_size or suggest_grid_size(trajectories))
+        segments = np.vstack([trajectory.segments for trajectory in trajectories])
+        owners = np.concatenate([np.full(len(trajectory), k) for k, trajectory in enumerate(trajectories)])
+        max_buffer = float(segments[:, 8].max())
+        rows = segments.tolist()
+        owner_ids = owners.tolist()
+
+        earliest = {}
+        pending_a, pending_b = [], []
+
+        def resolve_pending():
+            if not pending_a:
+                return
+            a, b = np.array(pending_a), np.array(pending_b)
+            mask, times, locations, distances = batch_segment_conflicts(segments[a], segments[b])
+            for k in np.flatnonzero(mask):
+                pair = (owner_ids[a[k]], owner_ids[b[k]])
+                if pair not in earliest or times[k] < earliest[pair][0]:
+                    earliest[pair] = (float(times[k]), tuple(float(c) for c in locations[k]), float(distances[k]))
+            pending_a.clear()
+            pending_b.clear()
+
+        active = []  # Heap of (end time, segment id)
+        for seg in np.argsort(segments[:, 6], kind='stable').tolist():
+            row = rows[seg]
+            while active and active[0][0] <= row[6]:
+                grid.remove(heapq.heappop(active)[1])
+            if row[7] <= row[6]:
+                continue  # Zero-duration segments cannot overlap anything in time
+            for other in grid.query(row, row[8] + max_buffer):
+                if owner_ids[other] != owner_ids[seg]:
+                    # Keep pairs in schedule order so each flight pair has one canonical key
+                    if owner_ids[other] < owner_ids[seg]:
+                        pending_a.append(other)
+                        pending_b.append(seg)
+                    else:
+                        pending_a.append(seg)
+                        pending_b.append(other)
+            if len(pending_a) >= SWEEP_PAIR_CHUNK:
+                resolve_pending()
+            grid.add(seg, row)
+            heapq.heappush(active, (row[7], seg))
+        resolve_pending()
+
+        conflicts = [
+            Conflict(time=time, location=location,
+                     involved_flights=[trajectories[i].drone_id, trajectories[j].drone_id], distance=distance)
+            for (i, j), (time, location, distance) in sorted(earliest.items(), key=lambda item: item[1][0])
+        ]
+        logger.info(f"Detected {len(conflicts)} conflicting pairs across {len(trajectories)} flights")
+        return conflicts
+    except Exception as e:
+        logger.error(f"Error in detect_all_conflicts: {str(e)}")
         raise
 
 def check_segment_collision(wp1: Waypoint, wp2: Waypoint, wp3: Waypoint, wp4: Waypoint, min_safe_distance: float) -> Optional[Conflict]:
     """Calculate closest approach between two trajectory segments in space and time."""
     try:
-        # Determine overlapping time window
-        t_start = max(wp1.timestamp, wp3.timestamp)
-        t_end = min(wp2.timestamp, wp4.timestamp)
-        if t_start >= t_end:
-            return None
-
-        # Compute velocity vectors for both segments
-        t1_duration = wp2.timestamp - wp1.timestamp or 1e-6
-        t2_duration = wp4.timestamp - wp3.timestamp or 1e-6
-        v1 = [(wp2.x - wp1.x) / t1_duration, (wp2.y - wp1.y) / t1_duration, (wp2.z - wp1.z) / t1_duration]
-        v2 = [(wp4.x - wp3.x) / t2_duration, (wp4.y - wp3.y) / t2_duration, (wp4.z - wp3.z) / t2_duration]
-        w = [wp1.x - wp3.x, wp1.y - wp3.y, wp1.z - wp3.z]
-        vr = [v1[i] - v2[i] for i in range(3)]
-        vr_dot_vr = sum(v * v for v in vr)
-
-        if vr_dot_vr == 0:  # Handle parallel paths
-            pos1 = interpolate_position([wp1, wp2], t_start)
-            pos2 = interpolate_position([wp3, wp4], t_start)
-            dist = pos1.distance_to(pos2)
-            if dist < min_safe_distance:
-                return Conflict(time=t_start, location=(pos1.x, pos1.y, pos1.z), involved_flights=["primary", "other"], distance=dist)
-            return None
-
-        # Calculate time of closest approach
-        t_closest = -sum(w[i] * vr[i] for i in range(3)) / vr_dot_vr
-        t_closest_abs = wp1.timestamp + t_closest * t1_duration
-        t_closest_abs = max(t_start, min(t_end, t_closest_abs))
-        pos1 = interpolate_position([wp1, wp2], t_closest_abs)
-        pos2 = interpolate_position([wp3, wp4], t_closest_abs)
-        dist = pos1.distance_to(pos2)
-        if dist < min_safe_distance:
-            return Conflict(time=t_closest_abs, location=(pos1.x, pos1.y, pos1.z), involved_flights=["primary", "other"], distance=dist)
+        # Split the combined buffer across both rows so the kernel's threshold matches min_safe_distance
+        half = min_safe_distance / 2
+        a = np.array([[wp1.x, wp1.y, wp1.z, wp2.x, wp2.y, wp2.z, wp1.timestamp, wp2.timestamp, half]])
+        b = np.array([[wp3.x, wp3.y, wp3.z, wp4.x, wp4.y, wp4.z, wp3.timestamp, wp4.timestamp, half]])
+        mask, times, locations, distances = batch_segment_conflicts(a, b)
+        if mask[0]:
+            return Conflict(time=float(times[0]), location=tuple(float(c) for c in locations[0]),
+                            involved_flights=["primary", "other"], distance=float(distances[0]))
         return None
     except Exception as e:
         logger.error(f"Error in check_segment_collision: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional
+from models import Mission, Waypoint, Conflict
+from trajectory import Trajectory
+from airspace import AirspaceStore, as_trajectory
+from deconfliction_engine import detect_segment_conflicts
+from config import ANALYSIS_HANDLES
+from collections import OrderedDict
+import threading
+import uuid
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class MissionAnalysis:
+    """Result of analyzing a mission, kept per segment so an edited mission can reuse it.
+
+    Segment results are keyed on the exact segment row (start, end, t0, t1, buffer), so a
+    segment is only reused when neither its geometry nor its timing moved.
+    """
+    __slots__ = ("analysis_id", "mission", "trajectory", "segment_conflicts", "generation",
+                 "reused_segments", "recomputed_segments")
+
+    def __init__(self, mission: Mission, trajectory: Trajectory, segment_conflicts: List[List[Conflict]],
+                 generation: int, reused_segments: int = 0):
+        self.analysis_id = uuid.uuid4().hex
+        self.mission = mission
+        self.trajectory = trajectory
+        self.segment_conflicts = segment_conflicts
+        self.generation = generation
+        self.reused_segments = reused_segments
+        self.recomputed_segments = len(segment_conflicts) - reused_segments
+
+    @property
+    def conflicts(self) -> List[Conflict]:
+        return [conflict for segment in self.segment_conflicts for conflict in segment]
+
+    def results_by_segment(self) -> Dict[bytes, List[Conflict]]:
+        return {row.tobytes(): conflicts for row, conflicts in zip(self.trajectory.segments, self.segment_conflicts)}
+
+def analyze(mission: Mission, airspace: AirspaceStore) -> MissionAnalysis:
+    """Analyze a mission from scratch, keeping per-segment results for later edits."""
+    trajectory = as_trajectory(mission)
+    with airspace.reading():
+        generation = airspace.generation
+        by_segment = detect_segment_conflicts(trajectory, airspace)
+    return MissionAnalysis(mission, trajectory, list(by_segment.values()), generation)
+
+def apply_edits(mission: Mission, edits: List[dict]) -> Mission:
+    """Apply waypoint edits in order and return a new validated mission.
+
+    Supported edits are {"op": "move" | "insert", "index": i, "waypoint": {...}} and
+    {"op": "delete", "index": i}.
+    """
+    waypoints = [Waypoint(x=wp.x, y=wp.y, z=wp.z) for wp in mission.waypoints]
+    for edit in edits:
+        op, index = edit.get("op"), edit.get("index")
+        if not isinstance(index, int) or index < 0 or index > len(waypoints) or \
+                (op != "insert" and index == len(waypoints)):
+            raise ValueError(f"Waypoint index {index} is out of range for edit {op}")
+        if op == "move":
+            waypoints[index] = Waypoint(**edit["waypoint"])
+        elif op == "insert":
+            waypoints.insert(index, Waypoint(**edit["waypoint"]))
+        elif op == "delete":
+            del waypoints[index]
+        else:
+            raise ValueError(f"Unknown edit operation: {op}")
+    data = mission.dict()
+    data["waypoints"] = [wp.dict() for wp in waypoints]
+    return Mission(**data)
+
+def reanalyze(previous: MissionAnalysis, mission: Mission, airspace: AirspaceStore,
+              unchanged_generation: Optional[int] = None) -> MissionAnalysis:
+    """Re-check an edited mission, recomputing only segments whose geometry or timing changed.
+
+    Timestamps are redistributed over the whole mission, so an edit that changes the total
+    path length shifts every segment's timing and falls back to a full re-check. Previous
+    results are reused while the airspace is at the generation they were computed at, or at
+    unchanged_generation: a later generation the caller has checked no write near the edited
+    mission landed before (see ResultCache.unchanged_generation).
+    """
+    if previous.mission.drone_id != mission.drone_id:
+        raise ValueError("An edit cannot change the drone id of an analysis")
+    trajectory = as_trajectory(mission)
+    # Reused and recomputed segments must come from the same airspace state
+    with airspace.reading():
+        generation = airspace.generation
+        reusable = generation in (previous.generation, unchanged_generation)
+        previous_results = previous.results_by_segment() if reusable else {}
+
+        segment_conflicts: List[Optional[List[Conflict]]] = []
+        changed = []
+        for i, row in enumerate(trajectory.segments):
+            reused = previous_results.get(row.tobytes())
+            if reused is None:
+                changed.append(i)
+            segment_conflicts.append(reused)
+
+        if changed:
+            for i, conflicts in detect_segment_conflicts(trajectory, airspace, changed).items():
+                segment_conflicts[i] = conflicts
+    logger.debug(f"Re-checked {len(changed)} of {len(segment_conflicts)} segments for mission {mission.drone_id}")
+    return MissionAnalysis(mission, trajectory, segment_conflicts, generation,
+                           reused_segments=len(segment_conflicts) - len(changed))
+
+class AnalysisRegistry:
+    """Bounded, least-recently-used store of analysis handles."""
+    def __init__(self, max_entries: int = ANALYSIS_HANDLES):
+        self.max_entries = max_entries
+        self.analyses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, analysis: MissionAnalysis) -> MissionAnalysis:
+        with self._lock:
+            self.analyses[analysis.analysis_id] = analysis
+            self.analyses.move_to_end(analysis.analysis_id)
+            while len(self.analyses) > self.max_entries:
+                self.analyses.popitem(last=False)
+        return analysis
+
+    def get(self, analysis_id: str) -> Optional[MissionAnalysis]:
+        with self._lock:
+            analysis = self.analyses.get(analysis_id)
+            if analysis is not None:
+                self.analyses.move_to_end(analysis_id)
+            return analysis
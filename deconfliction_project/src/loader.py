@@ -0,0 +1,185 @@
+from typing import Callable, Iterator, List, Optional
+from models import SimulatedFlight
+from trajectory import Trajectory
+from airspace import AirspaceStore, as_trajectory
+from spatial_index import suggest_grid_size
+from config import LOAD_CHUNK_SIZE, LOAD_PROGRESS_EVERY, LOAD_GRID_SAMPLE
+import codecs
+import json
+import os
+import threading
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class LoadProgress:
+    """Progress of a streaming flight load, safe to read from other threads."""
+    def __init__(self, path: str):
+        self.path = path
+        self.total_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+        self.bytes_read = 0
+        self.flights_loaded = 0
+        self.errors = 0
+        self.done = False
+        self.error: Optional[str] = None
+        self.finished = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "loading": not self.done,
+            "flights_loaded": self.flights_loaded,
+            "invalid_records": self.errors,
+            "bytes_read": self.bytes_read,
+            "total_bytes": self.total_bytes,
+            "error": self.error
+        }
+
+def _is_json_lines(path: str) -> bool:
+    return path.endswith((".jsonl", ".ndjson"))
+
+def iter_flight_records(path: str, progress: Optional[LoadProgress] = None,
+                        chunk_size: int = LOAD_CHUNK_SIZE) -> Iterator[dict]:
+    """Yield raw flight records one at a time from a JSON array or JSON Lines file.
+
+    JSON arrays are parsed incrementally from fixed-size chunks, so the whole file is never
+    held in memory; .jsonl / .ndjson files are read line by line. The file is read as bytes
+    and decoded incrementally so progress is counted in the same unit as its size.
+
+    An unparseable JSON Lines record is skipped (and counted as an error). A corrupt array
+    element cannot be skipped reliably, so it raises as soon as more input stops helping
+    instead of buffering the rest of the file.
+    """
+    with open(path, "rb") as f:
+        if _is_json_lines(path):
+            for number, line in enumerate(f, 1):
+                if progress:
+                    progress.bytes_read += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    if progress:
+                        progress.errors += 1
+                    logger.warning(f"Skipping unparseable line {number} of {path}: {str(e)}")
+                    continue
+                yield record
+            return
+
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        buffer, pos, started, eof = "", 0, False, False
+        failure = None  # (offset into the element, message) of the last failed parse
+        while True:
+            # Skip whitespace and separators between array elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                if not started:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{path} does not contain a JSON array of flights")
+                    started, pos = True, pos + 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    if eof:
+                        raise
+                    # A truncated element fails further along once more input arrives; a corrupt
+                    # one fails at the same place again (long strings are simply unterminated)
+                    attempt = (e.pos - pos, e.msg)
+                    if attempt == failure and not e.msg.startswith("Unterminated string"):
+                        raise ValueError(f"Corrupt flight record in {path}: {e.msg}") from e
+                    failure = attempt
+                else:
+                    pos, failure = end, None
+                    yield record
+                    continue
+            elif eof:
+                raise ValueError(f"Unexpected end of file in {path}")
+
+            # Need more input: drop consumed text and read the next chunk
+            buffer, pos = buffer[pos:], 0
+            chunk = f.read(chunk_size)
+            if progress:
+                progress.bytes_read += len(chunk)
+            eof = not chunk
+            buffer += text.decode(chunk, final=eof)
+
+def load_flights(path: str, airspace: AirspaceStore, progress: Optional[LoadProgress] = None,
+                 on_progress: Optional[Callable[[LoadProgress], None]] = None) -> LoadProgress:
+    """Validate and index flights one by one into the airspace, reporting progress as it goes.
+
+    Invalid records are logged and skipped. When an empty store was created without a fixed
+    grid size, the first LOAD_GRID_SAMPLE flights are held back and the grid is sized from
+    them before anything is indexed; the index is only rebuilt at the end if the whole
+    schedule calls for a very different cell size.
+    """
+    progress = progress or LoadProgress(path)
+
+    def add(trajectory: Trajectory):
+        try:
+            airspace.add_flight(trajectory)
+            progress.flights_loaded += 1
+        except Exception as e:
+            progress.errors += 1
+            logger.warning(f"Skipping invalid flight record: {str(e)}")
+            return
+        if progress.flights_loaded % LOAD_PROGRESS_EVERY == 0:
+            logger.info(f"Loaded {progress.flights_loaded} flights "
+                        f"({progress.bytes_read}/{progress.total_bytes} bytes)")
+            if on_progress:
+                on_progress(progress)
+
+    def size_grid(sample: List[Trajectory]):
+        airspace.retune_grid(suggest_grid_size(sample, airspace.index.time_bucket))  # Nothing indexed yet
+        for trajectory in sample:
+            add(trajectory)
+
+    try:
+        if not os.path.exists(path):
+            # No schedule filed yet: start with an empty airspace that live filings fill in
+            logger.warning(f"Flights file {path} does not exist; starting with an empty airspace")
+            return progress
+        sample: Optional[List[Trajectory]] = [] if airspace.auto_grid and not len(airspace) else None
+        for record in iter_flight_records(path, progress):
+            try:
+                trajectory = as_trajectory(SimulatedFlight(**record))
+            except Exception as e:
+                progress.errors += 1
+                logger.warning(f"Skipping invalid flight record: {str(e)}")
+                continue
+            if sample is None:
+                add(trajectory)
+                continue
+            sample.append(trajectory)
+            if len(sample) >= LOAD_GRID_SAMPLE:
+                size_grid(sample)
+                sample = None
+        if sample is not None:
+            size_grid(sample)
+        elif airspace.auto_grid:
+            grid_size = suggest_grid_size(airspace, airspace.index.time_bucket)
+            if not 0.5 <= grid_size / airspace.index.grid_size <= 2.0:
+                airspace.retune_grid(grid_size)
+        logger.info(f"Finished loading {progress.flights_loaded} flights from {path}")
+    except Exception as e:
+        progress.error = str(e)
+        logger.error(f"Failed to load flights from {path}: {str(e)}")
+    finally:
+        progress.done = True
+        progress.finished.set()
+    return progress
+
+def load_flights_in_background(path: str, airspace: AirspaceStore) -> LoadProgress:
+    """Start loading flights on a daemon thread and return its progress tracker immediately."""
+    progress = LoadProgress(path)
+    thread = threading.Thread(target=load_flights, args=(path, airspace, progress),
+                              name="flight-loader", daemon=True)
+    thread.start()
+    return progress
@@ -0,0 +1,134 @@
+"""Low-overhead engine instrumentation exposed in the Prometheus text format.
+
+Hot paths call record_stage() / record_candidates() with timings taken by time.perf_counter(); each
+observation is a bucket lookup and three additions under a lock. A request can also collect
+its own breakdown by running inside profile(), which is returned as a debug profile.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from config import METRICS_ENABLED
+from contextlib import contextmanager
+import bisect
+import contextvars
+import threading
+import os
+
+# Seconds, from 10 microseconds to 10 seconds
+TIME_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2,
+                0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 100000)
+RATIO_BUCKETS = (0.5, 0.75, 0.9, 0.95, 0.99, 0.995, 0.999, 0.9999, 1.0)
+
+class Histogram:
+    """Prometheus-style histogram with optional labels, safe to observe from many threads."""
+    def __init__(self, name: str, help: str, buckets: Sequence[float], label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.label_names = label_names
+        self.series: Dict[Tuple[str, ...], List] = {}  # Label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self.series.items()]
+        for labels, counts, total, count in sorted(snapshot):
+            base = [f'{name}="{value}"' for name, value in zip(self.label_names, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = ",".join(base + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = "{" + ",".join(base) + "}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {total:.9g}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+STAGE_SECONDS = Histogram("deconfliction_stage_seconds",
+                          "Time spent in each engine stage per call.", TIME_BUCKETS, ("stage",))
+CANDIDATES = Histogram("deconfliction_candidates_per_query",
+                       "Candidate segment pairs passed from the broad phase to the narrow phase per query.",
+                       COUNT_BUCKETS)
+PRUNING_RATIO = Histogram("deconfliction_pruning_ratio",
+                          "Fraction of all (primary segment, airspace segment) pairs discarded by the broad phase.",
+                          RATIO_BUCKETS)
+HISTOGRAMS = [STAGE_SECONDS, CANDIDATES, PRUNING_RATIO]
+
+def _reset_locks_after_fork():
+    # A worker forked while a request thread was observing would inherit a held lock forever
+    for histogram in HISTOGRAMS:
+        histogram._lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+# Per-request profile collected by whatever engine work runs inside profile()
+_profile: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("deconfliction_profile", default=None)
+
+@contextmanager
+def profile():
+    """Collect a breakdown of the engine work done in this context (and contexts copied from it)."""
+    collected = {"stages": {}, "candidates": 0, "pairs_considered": 0}
+    token = _profile.set(collected)
+    try:
+        yield collected
+    finally:
+        _profile.reset(token)
+
+def record_stage(stage: str, seconds: float):
+    if not METRICS_ENABLED:
+        return
+    STAGE_SECONDS.observe(seconds, stage)
+    collected = _profile.get()
+    if collected is not None:
+        collected["stages"][stage] = collected["stages"].get(stage, 0.0) + seconds
+
+def record_candidates(candidates: int, pairs_considered: int):
+    """Record one broad-phase result: candidates kept out of all primary x airspace segment pairs."""
+    if not METRICS_ENABLED:
+        return
+    CANDIDATES.observe(candidates)
+    if pairs_considered:
+        PRUNING_RATIO.observe(1.0 - candidates / pairs_considered)
+    collected = _profile.get()
+    if collected is not None:
+        collected["candidates"] += candidates
+        collected["pairs_considered"] += pairs_considered
+
+def replay_profile(collected: dict):
+    """Record a profile collected elsewhere (e.g. in a worker process) as if the work ran here."""
+    for stage, seconds in collected["stages"].items():
+        record_stage(stage, seconds)
+    if collected["stages"]:
+        record_candidates(collected["candidates"], collected["pairs_considered"])
+
+def summarize_profile(collected: dict) -> dict:
+    """JSON-friendly view of a collected profile; no recorded stages means the result was cached."""
+    pairs = collected["pairs_considered"]
+    return {
+        "stages_ms": {stage: seconds * 1000.0 for stage, seconds in collected["stages"].items()},
+        "candidates": collected["candidates"],
+        "pairs_considered": pairs,
+        "pruning_ratio": 1.0 - collected["candidates"] / pairs if pairs else None,
+        "cached": not collected["stages"]
+    }
+
+def render_metrics(gauges: Iterable[Tuple[str, str, str, float]] = ()) -> str:
+    """Render every histogram plus extra (name, type, help, value) samples as Prometheus text."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for name, kind, help, value in gauges:
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {value:.9g}"])
+    return "\n".join(lines) + "\n"
@@ -47,4 +47,11 @@ class Conflict(BaseModel):
     time: float
     location: Tuple[float, float, float]
     involved_flights: List[str]
-    distance: float
\ No newline at end of file
+    distance: float
+
+class DepartureSlot(BaseModel):
+    shift_start: float
+    shift_end: float
+    shift: float
+    start_time: float
+    end_time: float
\ No newline at end of file
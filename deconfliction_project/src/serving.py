@@ -0,0 +1,210 @@
+from typing import Callable, List, Optional, Tuple
+from airspace import AirspaceStore
+from trajectory import Trajectory
+from config import (ANALYSIS_EXECUTOR, ANALYSIS_WORKERS, ANALYSIS_QUEUE_SIZE, ANALYSIS_TIMEOUT,
+                    ANALYSIS_DELTA_LIMIT, ANALYSIS_REFRESH_INTERVAL, BATCH_MIN_PARALLEL)
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from metrics import profile, replay_profile
+import deconfliction_engine
+import contextvars
+import multiprocessing
+import threading
+import time
+import os
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class AnalysisOverloaded(Exception):
+    """Raised when every analysis slot is taken and the request should be retried later."""
+
+class AnalysisTimeout(Exception):
+    """Raised when an analysis does not finish within the request timeout."""
+
+def _call_in_worker(fn: Callable, args: tuple, generation: int, changes: List[Tuple[int, Trajectory, bool]]):
+    # Metrics recorded in a worker would stay there, so its profile travels back with the result
+    with profile() as collected:
+        deconfliction_engine._sync_worker(generation, changes)
+        result = fn(*args, deconfliction_engine._worker_airspace)
+    return result, collected
+
+class AnalysisExecutor:
+    """Bounded executor that runs CPU-bound checks off the request threads.
+
+    At most max_pending analyses are admitted at once (running or queued); beyond that
+    submissions fail fast with AnalysisOverloaded so requests are shed instead of piling
+    up, and cheap endpoints such as health checks always find a free request thread.
+    Callers wait at most timeout seconds for a result.
+
+    In "process" mode analyses run in forked workers holding a copy-on-write copy of the
+    airspace, which scales the engine across cores. Writes made after the fork are logged and
+    shipped with each analysis, and a worker replays the ones it has not seen before running
+    it, so a result never reflects an airspace older than the one current when it was
+    submitted. Once more than delta_limit writes have piled up (or the index was rebuilt) the
+    pool is re-forked from the live airspace, but at most once per refresh_interval seconds,
+    so a stream of live filings never turns into a stream of forks. In "thread" mode analyses
+    share the live airspace, bound by the GIL. Functions are called as fn(*args, airspace).
+    """
+    def __init__(self, airspace: AirspaceStore, mode: str = ANALYSIS_EXECUTOR,
+                 workers: Optional[int] = ANALYSIS_WORKERS, max_pending: int = ANALYSIS_QUEUE_SIZE,
+                 timeout: float = ANALYSIS_TIMEOUT, delta_limit: int = ANALYSIS_DELTA_LIMIT,
+                 refresh_interval: float = ANALYSIS_REFRESH_INTERVAL):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown analysis executor mode: {mode}")
+        self.airspace = airspace
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.delta_limit = delta_limit
+        self.refresh_interval = refresh_interval
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if mode == "thread" else None
+        self._pool_index = None
+        self._pool_started = 0.0
+        self._pool_lock = threading.Lock()
+        # Writes since the process pool was forked, as (generation, trajectory, added)
+        self._changes: List[Tuple[int, Trajectory, bool]] = []
+        if mode == "process":
+            airspace.add_listener(self._on_flight_changed)
+
+    def _on_flight_changed(self, trajectory: Trajectory):
+        # Runs under the airspace write lock, so the log stays in generation order
+        if self._pool is not None:
+            added = self.airspace.flights.get(trajectory.drone_id) is trajectory
+            self._changes.append((self.airspace.generation, trajectory, added))
+
+    def _process_pool(self) -> Tuple[ProcessPoolExecutor, int, List[Tuple[int, Trajectory, bool]]]:
+        """Current process pool, with the airspace generation and the writes its workers must replay."""
+        with self._pool_lock, self.airspace.reading():
+            stale = len(self._changes) > self.delta_limit or self.airspace.index is not self._pool_index
+            if self._pool is None or (stale and time.monotonic() - self._pool_started >= self.refresh_interval):
+                previous = self._pool
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+                # The read lock is held while the workers start so they all copy one consistent airspace
+                generation = self.airspace.generation
+                pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                           initializer=deconfliction_engine._init_batch_worker,
+                                           initargs=(self.airspace.snapshot_path or self.airspace, generation))
+                pool.submit(int).result()
+                self._pool, self._pool_index, self._pool_started = pool, self.airspace.index, time.monotonic()
+                self._changes = []
+                if previous is not None:
+                    logger.info(f"Re-forked analysis workers at airspace generation {generation}")
+                    previous.shutdown(wait=False)  # In-flight analyses finish on the old workers
+            return self._pool, self.airspace.generation, list(self._changes)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue fn(*args, airspace), or raise AnalysisOverloaded if no slot is free.
+
+        In process mode the future's result is a (result, worker profile) pair; run() unwraps it.
+        """
+        return self._submit(fn, args)
+
+    def _submit(self, fn: Callable, args: tuple, state: Optional[tuple] = None) -> Future:
+        # state pins a process-mode submission to an earlier (pool, generation, changes)
+        if not self._slots.acquire(blocking=False):
+            raise AnalysisOverloaded(f"All {self.max_pending} analysis slots are busy")
+        self._track_pending(1)
+        try:
+            if self.mode == "thread":
+                # Run in a copy of the caller's context so a request's debug profile sees the engine work
+                future = self._pool.submit(contextvars.copy_context().run, fn, *args, self.airspace)
+            else:
+                pool, generation, changes = state or self._process_pool()
+                future = pool.submit(_call_in_worker, fn, args, generation, changes)
+        except Exception:
+            self._release_slot()
+            raise
+        # The slot is held until the work really finishes, even if the caller timed out
+        future.add_done_callback(lambda _: self._release_slot())
+        return future
+
+    def _track_pending(self, delta: int):
+        with self._pending_lock:
+            self._pending += delta
+
+    def _release_slot(self):
+        self._track_pending(-1)
+        self._slots.release()
+
+    def run(self, fn: Callable, *args):
+        """Run fn(*args, airspace) on the executor and wait for its result."""
+        return self._result(self.submit(fn, *args), self.timeout)
+
+    def map(self, fn: Callable, items: list, min_shard: int = BATCH_MIN_PARALLEL) -> list:
+        """Run fn(shard, airspace) over shards of items across the workers, concatenating the results.
+
+        Every shard takes an analysis slot and sees the same airspace state. In thread mode the
+        GIL leaves nothing to gain from splitting, so the whole list runs as one analysis.
+        """
+        shards = self.workers if self.mode == "process" else 1
+        size = max(min_shard, -(-len(items) // shards), 1)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        if len(chunks) <= 1:
+            return self.run(fn, items)
+
+        state = self._process_pool()
+        futures = []
+        try:
+            for chunk in chunks:
+                futures.append(self._submit(fn, (chunk,), state))
+            deadline = None if self.timeout is None else time.monotonic() + self.timeout
+            results = []
+            for future in futures:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                results.extend(self._result(future, remaining))
+            return results
+        except (AnalysisOverloaded, AnalysisTimeout):
+            for future in futures:
+                future.cancel()
+            raise
+
+    def _result(self, future: Future, timeout: Optional[float]):
+        try:
+            result = future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise AnalysisTimeout(f"Analysis did not finish within {self.timeout:g} seconds")
+        if self.mode == "process":
+            result, collected = result
+            replay_profile(collected)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "timeout": self.timeout,
+            "unsynced_writes": len(self._changes)
+        }
+
+    def shutdown(self):
+        if self._on_flight_changed in self.airspace.listeners:
+            self.airspace.listeners.remove(self._on_flight_changed)
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+# Long-lived pool behind detect_conflicts_batch for callers outside the app
+_batch_executor: Optional[AnalysisExecutor] = None
+_batch_lock = threading.Lock()
+
+def batch_executor(airspace: AirspaceStore, workers: int) -> AnalysisExecutor:
+    """Process executor for batch analyses, kept until a different airspace or pool size is asked for."""
+    global _batch_executor
+    with _batch_lock:
+        current = _batch_executor
+        if current is None or current.airspace is not airspace or current.workers != workers:
+            if current is not None:
+                current.shutdown()
+            _batch_executor = AnalysisExecutor(airspace, mode="process", workers=workers, timeout=None)
+        return _batch_executor
@@ -0,0 +1,142 @@
+from typing import List, Tuple, Union
+from models import Mission, DepartureSlot
+from trajectory import Trajectory
+from airspace import AirspaceStore, as_trajectory
+from deconfliction_engine import batch_segment_conflicts, segment_rows
+from metrics import record_stage
+from config import SLOT_TOLERANCE
+import numpy as np
+import time
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+GOLDEN = (np.sqrt(5.0) - 1.0) / 2.0
+
+def _shifted_distance(a: np.ndarray, b: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+    """Closest approach of each pair with the primary row delayed by its shift (from the narrow-phase kernel)."""
+    shifted = a.copy()
+    shifted[:, 6:8] += shifts[:, None]
+    return batch_segment_conflicts(shifted, b)[3]
+
+def forbidden_shifts(a: np.ndarray, b: np.ndarray, earliest_shift: float, latest_shift: float,
+                     tolerance: float = SLOT_TOLERANCE) -> Tuple[np.ndarray, np.ndarray]:
+    """Interval of departure shifts at which each primary row a[k] conflicts with b[k].
+
+    Delaying the primary by s keeps the relative position affine in (t, s), and the pair's
+    shared window is a convex polygon in (t, s), so the closest approach h(s) is convex in s
+    while the windows overlap. The shifts with h(s) below the combined buffer therefore form
+    one open interval: a golden-section search finds the minimum of h for all pairs at once
+    and bisection finds where h crosses the buffer on either side of it. Returned intervals
+    are widened by tolerance; pairs that never conflict get an empty interval (lo > hi).
+    """
+    n = len(a)
+    # Shifts for which the two time windows overlap at all, clipped to the allowed range
+    lo = np.maximum(b[:, 6] - a[:, 7], earliest_shift)
+    hi = np.minimum(b[:, 7] - a[:, 6], latest_shift)
+    radius = a[:, 8] + b[:, 8]
+    if not n:
+        return lo, hi
+
+    # Golden-section search for the shift of closest approach
+    left, right = lo.copy(), hi.copy()
+    while np.any(right - left > tolerance):
+        # Both probes are re-evaluated each round, which keeps every pair in one kernel call
+        x1, x2 = right - GOLDEN * (right - left), left + GOLDEN * (right - left)
+        distances = _shifted_distance(np.vstack([a, a]), np.vstack([b, b]), np.concatenate([x1, x2]))
+        lower = distances[:n] < distances[n:]
+        right = np.where(lower, x2, right)
+        left = np.where(lower, left, x1)
+    best = (left + right) / 2.0
+    conflicting = (lo < hi) & (_shifted_distance(a, b, best) < radius)
+
+    # Bisection for the crossings of the buffer on each side of the minimum
+    def crossing(inside: np.ndarray, outside: np.ndarray) -> np.ndarray:
+        while np.any(np.abs(outside - inside) > tolerance):
+            middle = (inside + outside) / 2.0
+            closer = _shifted_distance(a, b, middle) < radius
+            inside = np.where(closer, middle, inside)
+            outside = np.where(closer, outside, middle)
+        return outside
+
+    start = np.where(conflicting, crossing(best.copy(), lo.copy()), np.inf)
+    end = np.where(conflicting, crossing(best.copy(), hi.copy()), -np.inf)
+    return start - tolerance, end + tolerance
+
+def find_departure_slots(primary_mission: Union[Mission, Trajectory], earliest_shift: float,
+                         latest_shift: float, airspace: AirspaceStore, limit: int = 1,
+                         order: str = "earliest") -> List[DepartureSlot]:
+    """Find conflict-free departure shifts for a mission within [earliest_shift, latest_shift].
+
+    The whole mission is delayed by the shift (negative shifts depart earlier). Candidate pairs
+    come from one index query over the mission's box and every time it could occupy; their
+    forbidden shift intervals are merged and the gaps between them are returned as slots,
+    ordered by earliest shift or by the shift nearest the requested departure ("nearest").
+    A limit of 0 returns every slot.
+    """
+    try:
+        if order not in ("earliest", "nearest"):
+            raise ValueError(f"Unknown slot order: {order}")
+        if earliest_shift > latest_shift:
+            raise ValueError("earliest_shift must not be after latest_shift")
+        primary = as_trajectory(primary_mission)
+        started = time.perf_counter()
+
+        # Broad phase: everything near the mission's path at any time it could be flying
+        a_rows = primary.segments
+        with airspace.reading():
+            margin = primary.safety_buffer + airspace.index.max_buffer
+            lo, hi, start_time, end_time = primary.bounds(margin)
+            entries = [entry for entry in airspace.query_region(lo, hi, start_time + earliest_shift,
+                                                                end_time + latest_shift)
+                       if entry[0].drone_id != primary.drone_id]
+            b_rows = segment_rows(entries)
+
+        # Pair every primary segment with the candidates it could meet at some allowed shift
+        b_lo = np.minimum(b_rows[:, 0:3], b_rows[:, 3:6])
+        b_hi = np.maximum(b_rows[:, 0:3], b_rows[:, 3:6])
+        primary_idx, other_idx = [], []
+        for i, row in enumerate(a_rows):
+            a_lo, a_hi = np.minimum(row[0:3], row[3:6]), np.maximum(row[0:3], row[3:6])
+            gap = np.maximum(0.0, np.maximum(b_lo - a_hi, a_lo - b_hi))
+            near = np.sqrt(np.einsum('ij,ij->i', gap, gap)) < row[8] + b_rows[:, 8]
+            timely = (b_rows[:, 6] - row[7] < latest_shift) & (b_rows[:, 7] - row[6] > earliest_shift)
+            matches = np.flatnonzero(near & timely)
+            primary_idx.append(np.full(len(matches), i))
+            other_idx.append(matches)
+        primary_idx = np.concatenate(primary_idx) if primary_idx else np.empty(0, dtype=int)
+        other_idx = np.concatenate(other_idx) if other_idx else np.empty(0, dtype=int)
+        search_started = time.perf_counter()
+        record_stage("broad_phase", search_started - started)
+
+        starts, ends = forbidden_shifts(a_rows[primary_idx], b_rows[other_idx], earliest_shift, latest_shift)
+        keep = starts < ends
+        intervals = sorted(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+        # Sweep the merged forbidden intervals and collect the gaps inside the allowed range
+        windows, cursor = [], earliest_shift
+        for start, end in intervals:
+            if start > cursor:
+                windows.append((cursor, min(start, latest_shift)))
+            cursor = max(cursor, end)
+            if cursor > latest_shift:
+                break
+        if cursor <= latest_shift:
+            windows.append((cursor, latest_shift))
+        record_stage("slot_search", time.perf_counter() - search_started)
+
+        slots = []
+        for window_start, window_end in windows:
+            shift = window_start if order == "earliest" else float(np.clip(0.0, window_start, window_end))
+            slots.append(DepartureSlot(shift_start=window_start, shift_end=window_end, shift=shift,
+                                       start_time=primary.start_time + shift, end_time=primary.end_time + shift))
+        if order == "nearest":
+            slots.sort(key=lambda slot: (abs(slot.shift), slot.shift))
+        logger.debug(f"Found {len(slots)} departure slots for mission {primary.drone_id} "
+                     f"from {len(intervals)} forbidden intervals")
+        return slots[:limit] if limit else slots
+    except Exception as e:
+        logger.error(f"Error in find_departure_slots: {str(e)}")
+        raise
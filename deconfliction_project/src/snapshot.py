@@ -0,0 +1,143 @@
+"""Binary, memory-mapped airspace snapshots.
+
+A snapshot stores the timestamped trajectories and the precomputed space-time index of an
+AirspaceStore as raw little-endian arrays behind a small JSON header. Loading maps the file
+read-only: trajectory segments are views into the mapping and index lookups binary-search
+its sorted cell table, so nothing is re-parsed, re-validated or re-indexed, and every process
+mapping the same file shares one physical copy of the data.
+
+Usage: python src/snapshot.py data/sample_simulated_flights.json -o airspace.snap
+"""
+from typing import Dict
+from airspace import AirspaceStore
+from trajectory import Trajectory, SEGMENT_COLUMNS
+from spatial_index import FrozenCells, cell_codes
+from loader import load_flights
+import argparse
+import json
+import struct
+import numpy as np
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MAGIC = b"UAVSNAP1"
+ALIGNMENT = 64
+
+def _index_arrays(airspace: AirspaceStore, flights) -> Dict[str, np.ndarray]:
+    """Flatten the cell membership of every flight into sorted, grouped arrays."""
+    index = airspace.index
+    keys, entries = [], []
+    for f, trajectory in enumerate(flights):
+        for segment_idx, row in enumerate(trajectory.segments.tolist()):
+            for key in index._swept_cells(row):
+                keys.append(key)
+                entries.append((f, segment_idx))
+    keys = np.array(keys, dtype=np.int64).reshape(-1, 4)
+    entries = np.array(entries, dtype=np.int64).reshape(-1, 2)
+    codes = cell_codes(keys)
+    order = np.lexsort((keys[:, 3], keys[:, 2], keys[:, 1], keys[:, 0], codes))
+    keys, entries, codes = keys[order], entries[order], codes[order]
+
+    # One row per distinct cell, with offsets into the grouped entries
+    if len(keys):
+        starts = np.flatnonzero(np.concatenate([[True], np.any(keys[1:] != keys[:-1], axis=1)]))
+    else:
+        starts = np.empty(0, dtype=np.int64)
+    return {
+        "cell_codes": codes[starts],
+        "cell_keys": keys[starts],
+        "cell_offsets": np.append(starts, len(keys)).astype(np.int64),
+        "cell_entries": entries
+    }
+
+def export_snapshot(airspace: AirspaceStore, path: str):
+    """Write the airspace's trajectories and index to a binary snapshot file."""
+    flights = list(airspace)
+    segments = (np.vstack([trajectory.segments for trajectory in flights]) if flights
+                else np.empty((0, len(SEGMENT_COLUMNS))))
+    arrays = {
+        "segments": np.ascontiguousarray(segments, dtype='<f8'),
+        "flight_offsets": np.cumsum([0] + [len(trajectory) for trajectory in flights]).astype('<i8'),
+        "flight_meta": np.array([(t.start_time, t.end_time, t.speed, t.safety_buffer) for t in flights],
+                                dtype='<f8').reshape(-1, 4),
+        "flight_static": np.array([t.static for t in flights], dtype=np.uint8)
+    }
+    arrays.update(_index_arrays(airspace, flights))
+
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({
+        "version": 1,
+        "grid_size": airspace.index.grid_size,
+        "time_bucket": airspace.index.time_bucket,
+        "drone_ids": [t.drone_id for t in flights],
+        "arrays": layout
+    }).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    logger.info(f"Wrote snapshot of {len(flights)} flights and {len(arrays['cell_codes'])} cells to {path}")
+
+def load_snapshot(path: str) -> AirspaceStore:
+    """Map a snapshot file read-only and return an AirspaceStore backed by it.
+
+    The returned store still accepts writes: new and amended flights go into the mutable
+    index layer, and removed snapshot flights are masked out of the frozen one.
+    """
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    if bytes(mapped[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not an airspace snapshot")
+    header_length = struct.unpack("<Q", bytes(mapped[len(MAGIC):len(MAGIC) + 8]))[0]
+    header = json.loads(bytes(mapped[len(MAGIC) + 8:len(MAGIC) + 8 + header_length]).decode("utf-8"))
+    data_start = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        start = data_start + spec["offset"]
+        arrays[name] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    offsets = arrays["flight_offsets"].tolist()
+    flights = []
+    for f, drone_id in enumerate(header["drone_ids"]):
+        start_time, end_time, speed, safety_buffer = arrays["flight_meta"][f].tolist()
+        flights.append(Trajectory(drone_id, arrays["segments"][offsets[f]:offsets[f + 1]], start_time, end_time,
+                                  speed, safety_buffer, bool(arrays["flight_static"][f])))
+
+    airspace = AirspaceStore(grid_size=header["grid_size"], time_bucket=header["time_bucket"])
+    airspace.flights = {trajectory.drone_id: trajectory for trajectory in flights}
+    airspace.segment_count = len(arrays["segments"])
+    airspace.index.attach_base(FrozenCells(arrays["cell_codes"], arrays["cell_keys"], arrays["cell_offsets"],
+                                           arrays["cell_entries"], flights))
+    airspace.snapshot_path = path
+    logger.info(f"Mapped snapshot of {len(flights)} flights from {path}")
+    return airspace
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a flights file to a binary airspace snapshot.")
+    parser.add_argument("flights", help="JSON array or JSON Lines (.jsonl/.ndjson) file of flights")
+    parser.add_argument("-o", "--output", required=True, help="Snapshot file to write")
+    args = parser.parse_args(argv)
+
+    airspace = AirspaceStore()
+    progress = load_flights(args.flights, airspace)
+    if progress.error:
+        return 1
+    export_snapshot(airspace, args.output)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
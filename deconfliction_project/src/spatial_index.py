@@ -0,0 +1,296 @@
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from trajectory import Trajectory
+from collections import Counter, defaultdict
+import numpy as np
+import statistics
+
+Cell = Tuple[int, int, int, int]
+
+DEFAULT_GRID_SIZE = 50.0
+
+def suggest_grid_size(trajectories: Iterable[Trajectory], time_bucket: float = 300.0) -> float:
+    """Derive a cell size from the buffer and speed distribution of a set of flights.
+
+    Cells should be comfortably wider than a typical combined safety buffer (so an inflated
+    query touches few cells) and comparable to the distance a typical flight covers within
+    one time bucket (so a clipped segment piece does not spread over many cells).
+    """
+    buffers, travel = [], []
+    for trajectory in trajectories:
+        segments = trajectory.segments
+        buffers.append(trajectory.safety_buffer)
+        path = float(np.linalg.norm(segments[:, 3:6] - segments[:, 0:3], axis=1).sum())
+        duration = trajectory.end_time - trajectory.start_time
+        travel.append(min(path, path / duration * time_bucket))
+    if not buffers:
+        return DEFAULT_GRID_SIZE
+    size = max(4 * statistics.median(buffers), statistics.median(travel))
+    return size if size > 0 else DEFAULT_GRID_SIZE
+
+def cell_code(key: Cell) -> int:
+    """Deterministic signed 64-bit hash of a cell key, matching cell_codes() element for element."""
+    x, y, z, b = key
+    h = ((x * 73856093) ^ (y * 19349663) ^ (z * 83492791) ^ (b * 2654435761)) & 0xFFFFFFFFFFFFFFFF
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def cell_codes(keys: np.ndarray) -> np.ndarray:
+    """Vectorized cell_code over an (n, 4) int64 array of cell keys (int64 arithmetic wraps)."""
+    with np.errstate(over='ignore'):
+        return ((keys[:, 0] * np.int64(73856093)) ^ (keys[:, 1] * np.int64(19349663))
+                ^ (keys[:, 2] * np.int64(83492791)) ^ (keys[:, 3] * np.int64(2654435761)))
+
+class FrozenCells:
+    """Read-only cell table backed by (possibly memory-mapped) snapshot arrays.
+
+    Cells are found by binary search over sorted key hashes, so nothing is rebuilt at load
+    time. Entries are (flight, segment) index pairs resolved against the snapshot's
+    trajectories; a flight removed after loading is masked out rather than deleted.
+    """
+    def __init__(self, codes: np.ndarray, keys: np.ndarray, offsets: np.ndarray,
+                 entries: np.ndarray, trajectories: List[Trajectory]):
+        self.codes = codes
+        self.keys = keys
+        self.offsets = offsets
+        self.entries = entries
+        self.trajectories = list(trajectories)
+        self.flight_index = {trajectory.drone_id: i for i, trajectory in enumerate(self.trajectories)}
+
+    def get(self, key: Cell, default=()) -> List[Tuple[Trajectory, int]]:
+        code = cell_code(key)
+        i = int(np.searchsorted(self.codes, code))
+        while i < len(self.codes) and self.codes[i] == code:
+            if tuple(self.keys[i].tolist()) == key:
+                found = []
+                for flight, segment_idx in self.entries[self.offsets[i]:self.offsets[i + 1]].tolist():
+                    trajectory = self.trajectories[flight]
+                    if trajectory is not None:
+                        found.append((trajectory, segment_idx))
+                return found
+            i += 1
+        return default
+
+    def discard(self, drone_id: str):
+        """Mask out every entry of a flight that has been removed or replaced."""
+        i = self.flight_index.pop(drone_id, None)
+        if i is not None:
+            self.trajectories[i] = None
+
+class SpatialIndex:
+    """Space-time grid index that groups segments into (x, y, z, time bucket) cells.
+
+    Each segment is split at time-bucket boundaries and only the cells swept by the
+    sub-segment inside a bucket are populated, so segments that pass through the same
+    place at different times never share a cell. Queries inflate the swept box by the
+    combined safety buffer so near-misses across a cell boundary are still found.
+    Entries are (trajectory, segment row) pairs.
+    """
+    def __init__(self, grid_size: float = DEFAULT_GRID_SIZE, time_bucket: float = 300.0):
+        self.grid_size = grid_size
+        self.time_bucket = time_bucket
+        self.cells = defaultdict(list)
+        # Cells touched by each indexed trajectory, so a flight can be removed without a full scan
+        self.memberships = defaultdict(set)
+        # Safety buffers of indexed trajectories, used to inflate queries by the worst case
+        self.mission_buffers = {}
+        self.buffers = Counter()
+        self._max_buffer = 0.0
+        # Optional read-only layer loaded from a snapshot, consulted alongside the mutable cells
+        self.base: Optional[FrozenCells] = None
+        # Smallest and largest cell key ever populated per axis (never shrunk), to clip region queries
+        self.extent: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def max_buffer(self) -> float:
+        """Largest safety buffer among indexed trajectories."""
+        if self._max_buffer is None:
+            self._max_buffer = max(self.buffers) if self.buffers else 0.0
+        return self._max_buffer
+
+    def _swept_cells(self, row: Sequence[float], margin: float = 0.0) -> Iterator[Cell]:
+        """Yield the cells within margin of a segment row (start, end, t0, t1, ...) over its time window."""
+        x1, y1, z1, x2, y2, z2, t1, t2 = row[:8]
+        duration = t2 - t1
+        for b in range(int(t1 // self.time_bucket), int(t2 // self.time_bucket) + 1):
+            # Clip the segment to this time bucket and take the bounds of the clipped piece
+            ta = max(t1, b * self.time_bucket)
+            tb = min(t2, (b + 1) * self.time_bucket)
+            fa = (ta - t1) / duration if duration > 0 else 0.0
+            fb = (tb - t1) / duration if duration > 0 else 0.0
+            xa, xb = x1 + fa * (x2 - x1), x1 + fb * (x2 - x1)
+            ya, yb = y1 + fa * (y2 - y1), y1 + fb * (y2 - y1)
+            za, zb = z1 + fa * (z2 - z1), z1 + fb * (z2 - z1)
+            x_cells = range(int((min(xa, xb) - margin) // self.grid_size), int((max(xa, xb) + margin) // self.grid_size) + 1)
+            y_cells = range(int((min(ya, yb) - margin) // self.grid_size), int((max(ya, yb) + margin) // self.grid_size) + 1)
+            z_cells = range(int((min(za, zb) - margin) // self.grid_size), int((max(za, zb) + margin) // self.grid_size) + 1)
+            for x in x_cells:
+                for y in y_cells:
+                    for z in z_cells:
+                        yield (x, y, z, b)
+
+    def _register_buffer(self, trajectory: Trajectory):
+        self.mission_buffers[trajectory.drone_id] = trajectory.safety_buffer
+        self.buffers[trajectory.safety_buffer] += 1
+        self._max_buffer = max(self.max_buffer, trajectory.safety_buffer)
+
+    def _extend(self, keys: np.ndarray):
+        if not len(keys):
+            return
+        lo, hi = keys.min(axis=0), keys.max(axis=0)
+        if self.extent is not None:
+            lo, hi = np.minimum(lo, self.extent[0]), np.maximum(hi, self.extent[1])
+        self.extent = (lo, hi)
+
+    def attach_base(self, base: FrozenCells):
+        """Use a prebuilt read-only cell table (from a snapshot) as the bottom layer of the index."""
+        self.base = base
+        self._extend(np.asarray(base.keys).reshape(-1, 4))
+        for trajectory in base.trajectories:
+            if trajectory is not None:
+                self._register_buffer(trajectory)
+
+    def add_trajectory(self, trajectory: Trajectory):
+        """Add every segment of a trajectory to the space-time cells it sweeps."""
+        self._register_buffer(trajectory)
+        membership = self.memberships[trajectory.drone_id]
+        for segment_idx, row in enumerate(trajectory.segments.tolist()):
+            for key in self._swept_cells(row):
+                self.cells[key].append((trajectory, segment_idx))
+                membership.add(key)
+        self._extend(np.array(list(membership), dtype=np.int64).reshape(-1, 4))
+
+    def remove_trajectory(self, drone_id: str):
+        """Remove every entry belonging to the given drone from the cells it occupies."""
+        buffer = self.mission_buffers.pop(drone_id, None)
+        if buffer is not None:
+            self.buffers[buffer] -= 1
+            if not self.buffers[buffer]:
+                del self.buffers[buffer]
+            if buffer >= self.max_buffer:
+                self._max_buffer = None  # Recomputed lazily on the next query
+        if self.base is not None:
+            self.base.discard(drone_id)
+        for key in self.memberships.pop(drone_id, ()):
+            remaining = [entry for entry in self.cells[key] if entry[0].drone_id != drone_id]
+            if remaining:
+                self.cells[key] = remaining
+            else:
+                del self.cells[key]
+
+    def query(self, row: Sequence[float], safety_buffer: float = 0.0) -> List[Tuple[Trajectory, int]]:
+        """Retrieve the unique indexed segments within the combined safety buffer of a segment row.
+
+        Only entries whose time window overlaps the row's window are returned.
+        """
+        t1, t2 = row[6], row[7]
+        nearby = []
+        seen = set()
+        layers = (self.cells,) if self.base is None else (self.base, self.cells)
+        for key in self._swept_cells(row, safety_buffer + self.max_buffer):
+            for trajectory, segment_idx in (entry for layer in layers for entry in layer.get(key, ())):
+                entry_id = (id(trajectory), segment_idx)
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                e1, e2 = trajectory.segments[segment_idx, 6:8]
+                if max(t1, e1) < min(t2, e2):
+                    nearby.append((trajectory, segment_idx))
+        return nearby
+
+    def query_region(self, lo: Sequence[float], hi: Sequence[float], start_time: float = -np.inf,
+                     end_time: float = np.inf) -> List[Tuple[Trajectory, int]]:
+        """Retrieve the unique indexed segments whose cells touch a box over a time window.
+
+        Bounds may be infinite; they are clipped to the populated extent of the index. When the
+        clipped box spans fewer cells than the index holds its cells are looked up directly,
+        otherwise every populated cell is scanned. The match is conservative at cell
+        granularity, so callers refine the result against the segments themselves.
+        """
+        if self.extent is None:
+            return []
+        cell_lo = np.maximum(np.floor(np.append(np.asarray(lo, dtype=np.float64) / self.grid_size,
+                                                start_time / self.time_bucket)), self.extent[0])
+        cell_hi = np.minimum(np.floor(np.append(np.asarray(hi, dtype=np.float64) / self.grid_size,
+                                                end_time / self.time_bucket)), self.extent[1])
+        if np.any(cell_hi < cell_lo):
+            return []
+        cell_lo, cell_hi = cell_lo.astype(np.int64).tolist(), cell_hi.astype(np.int64).tolist()
+        box_cells = int(np.prod([high - low + 1 for low, high in zip(cell_lo, cell_hi)], dtype=np.float64))
+        populated = len(self.cells) + (len(self.base.keys) if self.base is not None else 0)
+
+        groups = []
+        if box_cells <= populated:
+            layers = (self.cells,) if self.base is None else (self.base, self.cells)
+            for x in range(cell_lo[0], cell_hi[0] + 1):
+                for y in range(cell_lo[1], cell_hi[1] + 1):
+                    for z in range(cell_lo[2], cell_hi[2] + 1):
+                        for b in range(cell_lo[3], cell_hi[3] + 1):
+                            for layer in layers:
+                                entries = layer.get((x, y, z, b), ())
+                                if entries:
+                                    groups.append(entries)
+        else:
+            if self.base is not None and len(self.base.keys):
+                keys = self.base.keys
+                inside = np.all((keys >= cell_lo) & (keys <= cell_hi), axis=1)
+                for i in np.flatnonzero(inside).tolist():
+                    groups.append(self.base.get(tuple(keys[i].tolist())))
+            for key, entries in self.cells.items():
+                if all(cell_lo[d] <= key[d] <= cell_hi[d] for d in range(4)):
+                    groups.append(entries)
+
+        found = []
+        seen = set()
+        for trajectory, segment_idx in (entry for group in groups for entry in group):
+            entry_id = (id(trajectory), segment_idx)
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            e1, e2 = trajectory.segments[segment_idx, 6:8]
+            if e1 <= end_time and start_time <= e2:
+                found.append((trajectory, segment_idx))
+        return found
+
+class ActiveSegmentGrid:
+    """Purely spatial grid over the segments currently active in a time sweep.
+
+    The sweep guarantees time overlap, so cells only bucket on (x, y, z) and segments
+    are inserted when they start and removed when they end.
+    """
+    def __init__(self, grid_size: float = DEFAULT_GRID_SIZE):
+        self.grid_size = grid_size
+        self.cells = defaultdict(set)
+        self.memberships = {}
+
+    def _box_cells(self, row: Sequence[float], margin: float = 0.0) -> Iterator[Tuple[int, int, int]]:
+        """Yield the cells overlapping the bounding box of a segment row, inflated by margin."""
+        x1, y1, z1, x2, y2, z2 = row[:6]
+        x_cells = range(int((min(x1, x2) - margin) // self.grid_size), int((max(x1, x2) + margin) // self.grid_size) + 1)
+        y_cells = range(int((min(y1, y2) - margin) // self.grid_size), int((max(y1, y2) + margin) // self.grid_size) + 1)
+        z_cells = range(int((min(z1, z2) - margin) // self.grid_size), int((max(z1, z2) + margin) // self.grid_size) + 1)
+        for x in x_cells:
+            for y in y_cells:
+                for z in z_cells:
+                    yield (x, y, z)
+
+    def add(self, segment_id: int, row: Sequence[float]):
+        keys = list(self._box_cells(row))
+        for key in keys:
+            self.cells[key].add(segment_id)
+        self.memberships[segment_id] = keys
+
+    def remove(self, segment_id: int):
+        for key in self.memberships.pop(segment_id, ()):
+            cell = self.cells[key]
+            cell.discard(segment_id)
+            if not cell:
+                del self.cells[key]
+
+    def query(self, row: Sequence[float], margin: float) -> set:
+        """Ids of active segments whose cells overlap the row's box inflated by margin."""
+        nearby = set()
+        for key in self._box_cells(row, margin):
+            nearby.update(self.cells.get(key, ()))
+        return nearby
+
+    def __len__(self) -> int:
+        return len(self.memberships)
@@ -0,0 +1,105 @@
+from typing import Optional, Tuple
+from models import Mission, SimulatedFlight
+import numpy as np
+
+# Column layout of a trajectory's segment array, shared with the batched narrow phase
+SEGMENT_COLUMNS = ("x0", "y0", "z0", "x1", "y1", "z1", "t0", "t1", "buffer")
+
+class Trajectory:
+    """Compact, timestamped flight path used internally by the engine.
+
+    Each trajectory holds one contiguous (n, 9) float array with a row per segment
+    (start, end, t0, t1, buffer). A single-waypoint mission is stored as one zero-length
+    segment held for its whole time window. Pydantic models are only built at the API boundary.
+    """
+    __slots__ = ("drone_id", "segments", "start_time", "end_time", "speed", "safety_buffer", "static")
+
+    def __init__(self, drone_id: str, segments: np.ndarray, start_time: float, end_time: float,
+                 speed: float, safety_buffer: float, static: bool = False):
+        self.drone_id = drone_id
+        self.segments = segments
+        self.start_time = start_time
+        self.end_time = end_time
+        self.speed = speed
+        self.safety_buffer = safety_buffer
+        self.static = static
+
+    @classmethod
+    def from_mission(cls, mission: Mission) -> 'Trajectory':
+        """Timestamp a mission's waypoints (as Mission.assign_timestamps does) without mutating it."""
+        points = np.array([(wp.x, wp.y, wp.z) for wp in mission.waypoints], dtype=np.float64)
+        static = len(points) == 1
+        if static:
+            points = np.vstack([points, points])
+            times = np.array([mission.start_time, mission.end_time])
+        else:
+            distances = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+            total_distance = distances[-1]
+            if total_distance == 0:
+                times = np.full(len(points), mission.start_time)
+            else:
+                times = mission.start_time + distances / total_distance * (mission.end_time - mission.start_time)
+        segments = np.empty((len(points) - 1, len(SEGMENT_COLUMNS)), dtype=np.float64)
+        segments[:, 0:3] = points[:-1]
+        segments[:, 3:6] = points[1:]
+        segments[:, 6] = times[:-1]
+        segments[:, 7] = times[1:]
+        segments[:, 8] = mission.safety_buffer
+        return cls(mission.drone_id, segments, mission.start_time, mission.end_time,
+                   mission.speed, mission.safety_buffer, static)
+
+    @property
+    def points(self) -> np.ndarray:
+        """Waypoint coordinates as an (n, 3) array."""
+        if self.static:
+            return self.segments[:1, 0:3]
+        return np.vstack([self.segments[:, 0:3], self.segments[-1:, 3:6]])
+
+    @property
+    def times(self) -> np.ndarray:
+        """Waypoint timestamps as an (n,) array."""
+        if self.static:
+            return self.segments[:1, 6]
+        return np.append(self.segments[:, 6], self.segments[-1, 7])
+
+    def bounds(self, margin: float = 0.0) -> Tuple[np.ndarray, np.ndarray, float, float]:
+        """Spatial bounding box (inflated by margin) and time window of the whole flight."""
+        lo = np.minimum(self.segments[:, 0:3].min(axis=0), self.segments[:, 3:6].min(axis=0)) - margin
+        hi = np.maximum(self.segments[:, 0:3].max(axis=0), self.segments[:, 3:6].max(axis=0)) + margin
+        return lo, hi, self.start_time, self.end_time
+
+    def position_at(self, time: float) -> Optional[np.ndarray]:
+        """Interpolate the (x, y, z) position at a given time, or None outside the flight."""
+        if time < self.start_time or time > self.end_time:
+            return None
+        if self.static:
+            return self.segments[0, 0:3].copy()
+        times = self.times
+        if time <= times[0]:
+            return self.segments[0, 0:3].copy()
+        if time >= times[-1]:
+            return self.segments[-1, 3:6].copy()
+        idx = min(int(np.searchsorted(times, time, side='right')) - 1, len(self.segments) - 1)
+        row = self.segments[idx]
+        duration = row[7] - row[6]
+        f = (time - row[6]) / duration if duration > 0 else 0.0
+        return row[0:3] + f * (row[3:6] - row[0:3])
+
+    def to_dict(self) -> dict:
+        """Serialize to the same shape as SimulatedFlight.dict(), with timestamps assigned."""
+        return {
+            "drone_id": self.drone_id,
+            "waypoints": [{"x": float(p[0]), "y": float(p[1]), "z": float(p[2]), "timestamp": float(t)}
+                          for p, t in zip(self.points, self.times)],
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "speed": self.speed,
+            "safety_buffer": self.safety_buffer
+        }
+
+    def to_mission(self) -> SimulatedFlight:
+        """Rebuild a validated pydantic model for the API boundary."""
+        return SimulatedFlight(**self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.segments)
@@ -1,18 +1,32 @@
-from models import Waypoint
-from typing import List, Optional
+import numpy as np
 
-def interpolate_position(waypoints: List[Waypoint], time: float) -> Optional[Waypoint]:
-    """Interpolate position at a given time."""
-    if not waypoints or time < waypoints[0].timestamp or time > waypoints[-1].timestamp:
-        return None
-    for i in range(len(waypoints) - 1):
-        wp1, wp2 = waypoints[i], waypoints[i + 1]
-        if wp1.timestamp <= time <= wp2.timestamp:
-            t = (time - wp1.timestamp) / (wp2.timestamp - wp1.timestamp) if wp2.timestamp != wp1.timestamp else 0
-            return Waypoint(
-                x=wp1.x + t * (wp2.x - wp1.x),
-                y=wp1.y + t * (wp2.y - wp1.y),
-                z=wp1.z + t * (wp2.z - wp1.z),
-                timestamp=time
-            )
-    return waypoints[-1]
\ No newline at end of file
+def simplify_path(points: np.ndarray, times: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker simplification of a timestamped path, returning the indices to keep.
+
+    A point is dropped only if it lies within tolerance of where the simplified path would put
+    the drone at that point's timestamp (synchronized distance), so animated positions stay
+    within tolerance too, not just the drawn line. The first and last points are always kept.
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        duration = times[last] - times[first]
+        inner = slice(first + 1, last)
+        f = (times[inner] - times[first]) / duration if duration > 0 else np.zeros(last - first - 1)
+        expected = points[first] + f[:, None] * (points[last] - points[first])
+        offsets = points[inner] - expected
+        errors = np.einsum('ij,ij->i', offsets, offsets)
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance * tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
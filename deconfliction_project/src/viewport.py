@@ -0,0 +1,81 @@
+from typing import Dict, List, Sequence
+from trajectory import Trajectory
+from airspace import AirspaceStore
+from utils import simplify_path
+from config import VIEWPORT_PIXELS
+import numpy as np
+
+def flights_in_view(airspace: AirspaceStore, lo: Sequence[float], hi: Sequence[float],
+                    start_time: float = -np.inf, end_time: float = np.inf) -> List[Trajectory]:
+    """Flights with any part inside the (x, y, z) box during the time window, sorted by drone id.
+
+    The spatial index narrows the search to segments in touching cells; each candidate segment
+    is then clipped to the time window and its swept box tested against the viewport.
+    """
+    lo, hi = np.asarray(lo, dtype=np.float64), np.asarray(hi, dtype=np.float64)
+    if not (np.isfinite(lo).any() or np.isfinite(hi).any() or np.isfinite([start_time, end_time]).any()):
+        return sorted(airspace, key=lambda trajectory: trajectory.drone_id)  # Nothing to filter on
+    rows_by_flight: Dict[str, List[int]] = {}
+    trajectories: Dict[str, Trajectory] = {}
+    for trajectory, segment_idx in airspace.query_region(lo, hi, start_time, end_time):
+        trajectories[trajectory.drone_id] = trajectory
+        rows_by_flight.setdefault(trajectory.drone_id, []).append(segment_idx)
+
+    visible = []
+    for drone_id in sorted(rows_by_flight):
+        rows = trajectories[drone_id].segments[rows_by_flight[drone_id]]
+        t0, t1 = rows[:, 6], rows[:, 7]
+        ta, tb = np.maximum(t0, start_time), np.minimum(t1, end_time)
+        duration = t1 - t0
+        safe = np.where(duration > 0, duration, 1.0)
+        fa = np.where(duration > 0, (ta - t0) / safe, 0.0)[:, None]
+        fb = np.where(duration > 0, (tb - t0) / safe, 0.0)[:, None]
+        pa = rows[:, 0:3] + fa * (rows[:, 3:6] - rows[:, 0:3])
+        pb = rows[:, 0:3] + fb * (rows[:, 3:6] - rows[:, 0:3])
+        inside = ((ta <= tb) & np.all(np.minimum(pa, pb) <= hi, axis=1)
+                  & np.all(np.maximum(pa, pb) >= lo, axis=1))
+        if inside.any():
+            visible.append(trajectories[drone_id])
+    return visible
+
+def view_tolerance(lo: Sequence[float], hi: Sequence[float], flights: List[Trajectory],
+                   pixels: int = VIEWPORT_PIXELS) -> float:
+    """Simplification tolerance of about one screen pixel for a viewport (meters per pixel).
+
+    Unbounded viewport sides fall back to the extent of the flights being shown.
+    """
+    lo, hi = np.asarray(lo[:2], dtype=np.float64), np.asarray(hi[:2], dtype=np.float64)
+    if not np.all(np.isfinite(lo) & np.isfinite(hi)) and flights:
+        points = np.vstack([flight.points[:, :2] for flight in flights])
+        lo = np.where(np.isfinite(lo), lo, points.min(axis=0))
+        hi = np.where(np.isfinite(hi), hi, points.max(axis=0))
+    extent = float(np.max(hi - lo)) if np.all(np.isfinite(hi - lo)) else 0.0
+    return max(extent, 0.0) / max(pixels, 1)
+
+def render_flight(trajectory: Trajectory, tolerance: float = 0.0, start_time: float = -np.inf,
+                  end_time: float = np.inf) -> dict:
+    """Serialize a flight for display, clipped to the time window and simplified to the tolerance.
+
+    Waypoints keep their original timestamps; clipping keeps the waypoints just outside the
+    window so the drone's position is still defined at both ends of it.
+    """
+    points, times = trajectory.points, trajectory.times
+    original = len(times)
+    first = max(int(np.searchsorted(times, start_time, side='right')) - 1, 0)
+    last = min(int(np.searchsorted(times, end_time, side='left')), len(times) - 1)
+    points, times = points[first:last + 1], times[first:last + 1]
+    kept = simplify_path(points, times, tolerance)
+    return {
+        "drone_id": trajectory.drone_id,
+        "waypoints": [{"x": float(p[0]), "y": float(p[1]), "z": float(p[2]), "timestamp": float(t)}
+                      for p, t in zip(points[kept], times[kept])],
+        "start_time": trajectory.start_time,
+        "end_time": trajectory.end_time,
+        "speed": trajectory.speed,
+        "safety_buffer": trajectory.safety_buffer,
+        "original_waypoints": original
+    }
+
+def parse_bounds(args, prefix: str, default: str) -> List[float]:
+    """Read {prefix}_x, {prefix}_y and {prefix}_z query arguments, defaulting missing ones."""
+    return [float(args.get(f"{prefix}_{axis}", default)) for axis in ("x", "y", "z")]
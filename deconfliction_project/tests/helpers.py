@@ -0,0 +1,29 @@
+from models import Mission, Waypoint
+
+def make_mission(drone_id, points, z=0.0, start_time=1620000000.0, duration=3600.0, safety_buffer=10.0):
+    """A mission through the (x, y) points at altitude z, flown from start_time for duration seconds."""
+    return Mission(
+        drone_id=drone_id,
+        waypoints=[Waypoint(x=x, y=y, z=z) for x, y in points],
+        start_time=start_time,
+        end_time=start_time + duration,
+        speed=5.0,
+        safety_buffer=safety_buffer
+    )
+
+def make_flight(drone_id, z, start_time=1620000000.0):
+    """An hour-long diagonal flight from (0, 0) to (100, 100) at altitude z."""
+    return make_mission(drone_id, [(0, 0), (100, 100)], z, start_time)
+
+def random_mission(rng, drone_id, extent=400.0, max_buffer=20.0):
+    """A mission of 1-4 random waypoints inside a cube of the given side, departing within the hour."""
+    start = 1620000000.0 + float(rng.uniform(0, 3600))
+    return Mission(
+        drone_id=drone_id,
+        waypoints=[Waypoint(x=float(x), y=float(y), z=float(z))
+                   for x, y, z in rng.uniform(0, extent, (int(rng.integers(1, 5)), 3))],
+        start_time=start,
+        end_time=start + float(rng.uniform(300, 3600)),
+        speed=5.0,
+        safety_buffer=float(rng.uniform(5, max_buffer))
+    )
@@ -0,0 +1,59 @@
+import sys
+import os
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from trajectory import Trajectory
+from deconfliction_engine import detect_conflicts
+from helpers import make_flight
+
+class TestAirspaceStore(unittest.TestCase):
+    def setUp(self):
+        self.store = AirspaceStore.from_flights([make_flight("low", 0), make_flight("high", 200)])
+        self.primary = make_flight("primary", 0)
+
+    def test_add_and_query(self):
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(list(self.store.get("low").times), [1620000000.0, 1620003600.0])
+        conflicts = detect_conflicts(self.primary, self.store)
+        self.assertTrue(conflicts)
+
+    def test_remove_flight(self):
+        self.store.remove_flight("low")
+        self.assertNotIn("low", self.store)
+        self.assertFalse(detect_conflicts(self.primary, self.store))
+        with self.assertRaises(KeyError):
+            self.store.remove_flight("low")
+
+    def test_update_flight(self):
+        self.store.update_flight(make_flight("low", 300))
+        self.assertFalse(detect_conflicts(self.primary, self.store))
+
+    def test_time_disjoint_segments_are_not_candidates(self):
+        self.store.add_flight(make_flight("later", 0, start_time=1620007200.0))
+        primary = Trajectory.from_mission(self.primary)
+        candidates = self.store.query(primary.segments[0], primary.safety_buffer)
+        self.assertEqual([m.drone_id for m, _ in candidates], ["low"])
+
+    def test_long_segment_reports_single_conflict(self):
+        store = AirspaceStore.from_flights([make_flight("low", 0)], grid_size=10.0)
+        conflicts = detect_conflicts(self.primary, store)
+        self.assertEqual(len(conflicts), 1)
+
+    def test_near_miss_across_cell_boundary(self):
+        # 15 m apart vertically, either side of a cell boundary, within the 20 m combined buffer
+        store = AirspaceStore.from_flights([make_flight("below", 45)], grid_size=50.0)
+        conflicts = detect_conflicts(make_flight("primary", 60), store)
+        self.assertEqual(len(conflicts), 1)
+
+    def test_duplicate_flight(self):
+        with self.assertRaises(ValueError):
+            self.store.add_flight(make_flight("low", 0))
+
+if __name__ == "__main__":
+    unittest.main()
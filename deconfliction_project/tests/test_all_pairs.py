@@ -0,0 +1,30 @@
+import sys
+import os
+import unittest
+import numpy as np
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from deconfliction_engine import detect_all_conflicts, detect_conflicts
+from helpers import random_mission
+
+class TestAllPairs(unittest.TestCase):
+    def test_matches_pairwise_detection(self):
+        rng = np.random.default_rng(3)
+        flights = [random_mission(rng, f"flight_{i}", extent=300.0, max_buffer=25.0) for i in range(40)]
+        expected = set()
+        for i, a in enumerate(flights):
+            for b in flights[i + 1:]:
+                if detect_conflicts(a, [b]):
+                    expected.add((a.drone_id, b.drone_id))
+        conflicts = detect_all_conflicts(flights)
+        pairs = [tuple(c.involved_flights) for c in conflicts]
+        self.assertEqual(len(pairs), len(set(pairs)), "Each pair must be reported once")
+        self.assertEqual(set(pairs), expected)
+        self.assertTrue(expected)
+
+if __name__ == "__main__":
+    unittest.main()
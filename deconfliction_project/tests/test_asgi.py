@@ -0,0 +1,55 @@
+import sys
+import os
+import asyncio
+import importlib.util
+import json
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+@unittest.skipUnless(importlib.util.find_spec("a2wsgi"), "a2wsgi is not installed")
+class TestAsgiApplication(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import app
+        app.LOAD_PROGRESS.finished.wait()
+        import asgi
+        cls.application = asgi.application
+
+    def request(self, method, path, body=b""):
+        """Drive one HTTP request through the ASGI callable and collect the response."""
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+                 "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+                 "root_path": "", "headers": [(b"host", b"localhost"), (b"content-type", b"application/json"),
+                                               (b"content-length", str(len(body)).encode())],
+                 "client": ("127.0.0.1", 12345), "server": ("localhost", 5000)}
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(self.application(scope, receive, send))
+        status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+        content = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+        return status, json.loads(content)
+
+    def test_health_and_analysis(self):
+        status, body = self.request("GET", "/api/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["status"], "healthy")
+
+        mission = {"drone_id": "asgi-primary", "waypoints": [{"x": 0, "y": 0, "z": 900}, {"x": 10, "y": 10, "z": 900}],
+                   "start_time": 1000.0, "end_time": 2000.0}
+        status, body = self.request("POST", "/api/analyze-mission", json.dumps({"mission": mission}).encode())
+        self.assertEqual(status, 200)
+        self.assertEqual(body["status"], "clear")
+
+if __name__ == '__main__':
+    unittest.main()
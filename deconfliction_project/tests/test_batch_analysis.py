@@ -0,0 +1,37 @@
+import sys
+import os
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from deconfliction_engine import detect_conflicts, detect_conflicts_batch
+import serving
+from helpers import make_flight, make_mission
+
+class TestBatchAnalysis(unittest.TestCase):
+    def test_batch_matches_sequential_in_order(self):
+        airspace = AirspaceStore.from_flights([make_flight(f"flight_{z}", z) for z in range(0, 200, 40)])
+        missions = [make_mission(f"primary_{i}", [(i % 7, 0), (100 + i % 7, 100)], (i * 17) % 220) for i in range(12)]
+        expected = [detect_conflicts(mission, airspace) for mission in missions]
+        results = detect_conflicts_batch(missions, airspace, workers=2)
+        self.assertEqual(len(results), len(missions))
+        for got, want in zip(results, expected):
+            self.assertEqual([c.dict() for c in got], [c.dict() for c in want])
+
+    def test_batches_share_one_long_lived_pool(self):
+        airspace = AirspaceStore.from_flights([make_flight("flight_0", 0)])
+        missions = [make_mission(f"primary_{i}", [(i, 0), (100 + i, 100)]) for i in range(16)]
+        self.assertTrue(all(detect_conflicts_batch(missions, airspace, workers=2)))
+        pool = serving._batch_executor._pool
+        # A later batch after a write reuses the same workers and still sees the write
+        airspace.remove_flight("flight_0")
+        self.assertFalse(any(detect_conflicts_batch(missions, airspace, workers=2)))
+        self.assertIs(serving._batch_executor._pool, pool)
+        self.assertEqual(serving._batch_executor.stats()["pending"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import sys
+import os
+import unittest
+
+# Add src/ and the project root (for the benchmarks package) to the module search path
+project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+src_path = os.path.join(project_path, 'src')
+for path in (src_path, project_path):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.generator import generate_flights, generate_missions
+from benchmarks.run import compare, run_benchmarks
+
+class TestGenerator(unittest.TestCase):
+    def test_seeded_and_valid(self):
+        first = generate_flights(50, seed=7)
+        second = generate_flights(50, seed=7)
+        self.assertEqual([f.dict() for f in first], [f.dict() for f in second])
+        self.assertNotEqual([f.dict() for f in first], [f.dict() for f in generate_flights(50, seed=8)])
+        for flight in first:
+            self.assertTrue(3 <= len(flight.waypoints) <= 8)
+            self.assertTrue(all(30.0 <= wp.z <= 120.0 for wp in flight.waypoints))
+            self.assertGreater(flight.end_time, flight.start_time)
+        self.assertEqual(generate_missions(2)[0].drone_id, "mission_0")
+
+class TestBenchmarkRun(unittest.TestCase):
+    def test_run_and_compare(self):
+        results = run_benchmarks([40], missions=3, endpoints=False, repeat=1)
+        metrics = results["results"]["40"]
+        for metric in ("build_seconds", "memory_bytes", "query_p50_ms", "batch_missions_per_second",
+                       "all_pairs_seconds"):
+            self.assertIn(metric, metrics)
+
+        slower = {"results": {"40": dict(metrics, query_p50_ms=metrics["query_p50_ms"] * 2,
+                                         batch_missions_per_second=metrics["batch_missions_per_second"] * 2)}}
+        verdicts = {row["metric"]: row["verdict"] for row in compare(results, slower)}
+        self.assertEqual(verdicts["query_p50_ms"], "regression")
+        self.assertEqual(verdicts["batch_missions_per_second"], "improvement")
+        self.assertEqual(verdicts["build_seconds"], "unchanged")
+        self.assertNotIn("segments", verdicts)
+
+if __name__ == '__main__':
+    unittest.main()
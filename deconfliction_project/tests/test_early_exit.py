@@ -0,0 +1,31 @@
+import sys
+import os
+import unittest
+import numpy as np
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from deconfliction_engine import detect_conflicts, first_conflict, is_clear
+from helpers import random_mission
+
+class TestEarlyExit(unittest.TestCase):
+    def test_agrees_with_full_enumeration(self):
+        rng = np.random.default_rng(11)
+        airspace = AirspaceStore.from_flights([random_mission(rng, f"flight_{i}") for i in range(60)])
+        outcomes = set()
+        for i in range(40):
+            mission = random_mission(rng, f"primary_{i}")
+            conflicts = detect_conflicts(mission, airspace)
+            first = first_conflict(mission, airspace)
+            self.assertEqual(is_clear(mission, airspace), not conflicts)
+            if first is not None:
+                self.assertIn(first.dict(), [c.dict() for c in conflicts])
+            outcomes.add(bool(conflicts))
+        self.assertEqual(outcomes, {True, False})
+
+if __name__ == "__main__":
+    unittest.main()
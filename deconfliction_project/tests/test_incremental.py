@@ -0,0 +1,97 @@
+import sys
+import os
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from deconfliction_engine import detect_conflicts
+from incremental import AnalysisRegistry, analyze, apply_edits, reanalyze
+from cache import ResultCache
+from helpers import make_mission
+
+# Ground-level flights with a 5 m buffer, all in the air for t in [0, 400]
+SHORT_FLIGHT = {"start_time": 0.0, "duration": 400.0, "safety_buffer": 5.0}
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    def setUp(self):
+        # A crossing flight that meets the primary's third segment around t=250
+        self.airspace = AirspaceStore.from_flights(
+            [make_mission("crossing", [(250, 0), (250, 320)], **SHORT_FLIGHT)], grid_size=50.0)
+        self.primary = make_mission("primary", [(0, 200), (100, 200), (200, 200), (300, 200), (400, 200)],
+                                    **SHORT_FLIGHT)
+
+    def test_analysis_matches_full_detection(self):
+        analysis = analyze(self.primary, self.airspace)
+        self.assertEqual(len(analysis.segment_conflicts), 4)
+        self.assertEqual(len(analysis.conflicts), len(detect_conflicts(self.primary, self.airspace)))
+        self.assertTrue(analysis.conflicts)
+
+    def test_length_preserving_edit_reuses_unchanged_segments(self):
+        analysis = analyze(self.primary, self.airspace)
+        # Turning the last leg keeps the total path length, so earlier segments keep their timing
+        edited = apply_edits(self.primary, [{"op": "move", "index": 4, "waypoint": {"x": 300, "y": 300, "z": 0}}])
+        result = reanalyze(analysis, edited, self.airspace)
+        self.assertEqual(result.reused_segments, 3)
+        self.assertEqual(result.recomputed_segments, 1)
+        self.assertEqual([c.time for c in result.conflicts],
+                         [c.time for c in detect_conflicts(edited, self.airspace)])
+
+    def test_length_changing_edit_retimes_every_segment(self):
+        analysis = analyze(self.primary, self.airspace)
+        edited = apply_edits(self.primary, [{"op": "move", "index": 1, "waypoint": {"x": 100, "y": 230, "z": 0}}])
+        result = reanalyze(analysis, edited, self.airspace)
+        self.assertEqual(result.reused_segments, 0)
+        self.assertEqual(len(result.conflicts), len(detect_conflicts(edited, self.airspace)))
+
+    def test_rerouting_around_conflict(self):
+        analysis = analyze(self.primary, self.airspace)
+        edited = apply_edits(self.primary, [{"op": "delete", "index": 3},
+                                            {"op": "insert", "index": 3,
+                                             "waypoint": {"x": 300, "y": 200, "z": 100}}])
+        result = reanalyze(analysis, edited, self.airspace)
+        self.assertEqual(len(result.conflicts), len(detect_conflicts(edited, self.airspace)))
+
+    def test_airspace_change_forces_full_recheck(self):
+        analysis = analyze(self.primary, self.airspace)
+        self.airspace.add_flight(make_mission("late", [(0, 500), (100, 600)], **SHORT_FLIGHT))
+        result = reanalyze(analysis, self.primary, self.airspace)
+        self.assertEqual(result.reused_segments, 0)
+        self.assertEqual(result.recomputed_segments, 4)
+
+    def test_distant_airspace_change_keeps_reuse(self):
+        cache = ResultCache(self.airspace)
+        analysis = analyze(self.primary, self.airspace)
+        edited = apply_edits(self.primary, [{"op": "move", "index": 4, "waypoint": {"x": 300, "y": 300, "z": 0}}])
+        # A filing kilometres away does not touch the edited mission's space-time box
+        self.airspace.add_flight(make_mission("far", [(5000, 5000), (5100, 5000)], **SHORT_FLIGHT))
+        unchanged = cache.unchanged_generation(edited, analysis.generation)
+        self.assertEqual(unchanged, self.airspace.generation)
+        result = reanalyze(analysis, edited, self.airspace, unchanged)
+        self.assertEqual(result.reused_segments, 3)
+
+        # One that crosses the mission does
+        self.airspace.add_flight(make_mission("near", [(50, 100), (50, 300)], **SHORT_FLIGHT))
+        self.assertIsNone(cache.unchanged_generation(edited, analysis.generation))
+        result = reanalyze(analysis, edited, self.airspace, None)
+        self.assertEqual(result.reused_segments, 0)
+        self.assertEqual(len(result.conflicts), len(detect_conflicts(edited, self.airspace)))
+
+    def test_invalid_edits(self):
+        with self.assertRaises(ValueError):
+            apply_edits(self.primary, [{"op": "move", "index": 5, "waypoint": {"x": 0, "y": 0, "z": 0}}])
+        with self.assertRaises(ValueError):
+            apply_edits(self.primary, [{"op": "rotate", "index": 0}])
+
+    def test_registry_evicts_oldest(self):
+        registry = AnalysisRegistry(max_entries=1)
+        first = registry.add(analyze(self.primary, self.airspace))
+        second = registry.add(analyze(self.primary, self.airspace))
+        self.assertIsNone(registry.get(first.analysis_id))
+        self.assertIs(registry.get(second.analysis_id), second)
+
+if __name__ == '__main__':
+    unittest.main()
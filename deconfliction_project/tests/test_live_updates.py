@@ -0,0 +1,111 @@
+import sys
+import os
+import threading
+import time
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore, ReadWriteLock
+from deconfliction_engine import detect_conflicts
+from helpers import make_flight
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_readers_share_and_writer_waits(self):
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        lock.acquire_read()  # Re-entrant read
+        acquired = threading.Event()
+
+        def write():
+            with lock.writing():
+                acquired.set()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        self.assertFalse(acquired.wait(0.05))
+        lock.release_read()
+        self.assertFalse(acquired.wait(0.05))
+        lock.release_read()
+        self.assertTrue(acquired.wait(1.0))
+        writer.join()
+
+    def test_writer_may_read(self):
+        lock = ReadWriteLock()
+        with lock.writing():
+            with lock.reading():
+                with lock.writing():
+                    pass
+        with lock.reading():
+            pass
+
+class TestConcurrentAmendments(unittest.TestCase):
+    def test_readers_never_see_half_applied_update(self):
+        store = AirspaceStore.from_flights([make_flight("moving", 0)])
+        primary = make_flight("primary", 0)
+        stop = threading.Event()
+        errors = []
+
+        def amend():
+            z = 0
+            while not stop.is_set():
+                z = 200 if z == 0 else 0
+                store.update_flight(make_flight("moving", z))
+
+        def read():
+            while not stop.is_set():
+                with store.reading():
+                    flights = [flight.drone_id for flight in store]
+                    if flights != ["moving"]:
+                        errors.append(flights)
+
+        threads = [threading.Thread(target=amend)] + [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 0.3
+        while time.time() < deadline:
+            detect_conflicts(primary, store)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(store), 1)
+
+class TestFlightEndpoints(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import app
+        app.LOAD_PROGRESS.finished.wait()
+        cls.app = app
+        cls.client = app.app.test_client()
+
+    def flight_body(self, z):
+        body = make_flight("live-test", z).dict()
+        for waypoint in body["waypoints"]:
+            del waypoint["timestamp"]
+        return body
+
+    def test_file_amend_cancel(self):
+        mission = {"mission": make_flight("primary-live", 500).dict()}
+        response = self.client.post('/api/flights', json=self.flight_body(0))
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("live-test", self.app.AIRSPACE)
+        self.assertEqual(self.client.post('/api/flights', json=self.flight_body(0)).status_code, 409)
+        self.assertEqual(self.client.post('/api/analyze-mission', json=mission).get_json()["status"], "clear")
+
+        response = self.client.put('/api/flights/live-test', json=self.flight_body(500))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["waypoints"][0]["z"], 500)
+        # The cached "clear" result was invalidated by the amendment
+        self.assertEqual(self.client.post('/api/analyze-mission', json=mission).get_json()["status"], "conflict")
+
+        self.assertEqual(self.client.delete('/api/flights/live-test').status_code, 200)
+        self.assertNotIn("live-test", self.app.AIRSPACE)
+        self.assertEqual(self.client.delete('/api/flights/live-test').status_code, 404)
+        self.assertEqual(self.client.put('/api/flights/live-test', json=self.flight_body(0)).status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from spatial_index import suggest_grid_size
+from loader import LoadProgress, iter_flight_records, load_flights
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_simulated_flights.json')
+
+class TestLoader(unittest.TestCase):
+    def setUp(self):
+        with open(SAMPLE_FILE) as f:
+            self.records = json.load(f)
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_incremental_array_parsing(self):
+        # A tiny chunk size forces records to straddle chunk boundaries
+        records = list(iter_flight_records(SAMPLE_FILE, chunk_size=7))
+        self.assertEqual(records, self.records)
+
+    def test_json_lines(self):
+        path = os.path.join(self.tmpdir.name, "flights.jsonl")
+        with open(path, "w") as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+        self.assertEqual(list(iter_flight_records(path)), self.records)
+
+    def test_load_skips_invalid_records(self):
+        path = os.path.join(self.tmpdir.name, "flights.json")
+        with open(path, "w") as f:
+            json.dump(self.records[:3] + [{"drone_id": "broken"}], f)
+        airspace = AirspaceStore(grid_size=None)
+        progress = load_flights(path, airspace)
+        self.assertTrue(progress.done)
+        self.assertEqual(progress.flights_loaded, 3)
+        self.assertEqual(progress.errors, 1)
+        self.assertEqual(len(airspace), 3)
+        self.assertEqual(progress.bytes_read, progress.total_bytes)
+
+    def test_grid_is_sized_before_indexing(self):
+        airspace = AirspaceStore(grid_size=None)
+        retune = airspace.retune_grid
+        retuned_with = []
+        def record_retune(grid_size=None):
+            retuned_with.append(len(airspace))
+            retune(grid_size)
+        airspace.retune_grid = record_retune
+        progress = load_flights(SAMPLE_FILE, airspace)
+        self.assertEqual(progress.flights_loaded, len(self.records))
+        # One rebuild, of the still-empty index, sized from the sampled flights
+        self.assertEqual(retuned_with, [0])
+        self.assertEqual(airspace.index.grid_size, suggest_grid_size(list(airspace), airspace.index.time_bucket))
+
+    def test_progress_counts_bytes(self):
+        # Multi-byte characters, split across chunks, must still add up to the file size
+        records = [dict(self.records[0], drone_id=f"drône-ü-{i}") for i in range(3)]
+        for name in ("flights.json", "flights.jsonl"):
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, "w", encoding="utf-8") as f:
+                if name.endswith(".jsonl"):
+                    f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+                else:
+                    json.dump(records, f, ensure_ascii=False)
+            progress = LoadProgress(path)
+            self.assertEqual(list(iter_flight_records(path, progress, chunk_size=5)), records)
+            self.assertEqual(progress.bytes_read, progress.total_bytes)
+
+    def test_skips_unparseable_json_lines(self):
+        path = os.path.join(self.tmpdir.name, "flights.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps(self.records[0]) + "\n{not json\n" + json.dumps(self.records[1]) + "\n")
+        progress = LoadProgress(path)
+        self.assertEqual(list(iter_flight_records(path, progress)), self.records[:2])
+        self.assertEqual(progress.errors, 1)
+
+    def test_corrupt_array_element_fails_fast(self):
+        path = os.path.join(self.tmpdir.name, "flights.json")
+        text = json.dumps(self.records * 200)
+        corrupt_at = text.index('{"drone_id"', 1000)
+        with open(path, "w") as f:
+            f.write(text[:corrupt_at + 1] + text[corrupt_at + 2:])  # Drop a quote from one key
+        airspace = AirspaceStore(grid_size=50.0)
+        progress = LoadProgress(path)
+        load_flights(path, airspace, progress)
+        self.assertTrue(progress.done)
+        self.assertIn("Corrupt flight record", progress.error)
+        # The parser gave up near the corrupt element instead of reading to the end of the file
+        self.assertLess(progress.bytes_read, progress.total_bytes / 2)
+
+    def test_missing_file_is_an_empty_airspace(self):
+        progress = load_flights(os.path.join(self.tmpdir.name, "missing.json"), AirspaceStore())
+        self.assertTrue(progress.done)
+        self.assertIsNone(progress.error)
+        self.assertEqual(progress.flights_loaded, 0)
+
+class TestLoadingGate(unittest.TestCase):
+    def setUp(self):
+        import app
+        app.LOAD_PROGRESS.finished.wait()
+        # Stand in a load that has not finished yet
+        self.addCleanup(setattr, app, "LOAD_PROGRESS", app.LOAD_PROGRESS)
+        app.LOAD_PROGRESS = LoadProgress(SAMPLE_FILE)
+        self.app = app
+        self.client = app.app.test_client()
+
+    def test_analyses_wait_for_the_airspace(self):
+        with open(SAMPLE_FILE) as f:
+            mission = json.load(f)[0]
+        for url, body in [('/api/analyze-mission', {"mission": mission}),
+                          ('/api/analyze-missions', {"missions": [mission]}),
+                          ('/api/find-slots', {"mission": mission, "departure_window": [0, 60]}),
+                          ('/api/analyses/unknown/edits', {"edits": []})]:
+            response = self.client.post(url, json=body)
+            self.assertEqual(response.status_code, 503, url)
+            self.assertEqual(response.headers["Retry-After"], "1")
+            self.assertTrue(response.get_json()["airspace_loading"])
+        self.assertEqual(self.client.get('/api/health').status_code, 200)
+
+        self.app.LOAD_PROGRESS.done = True
+        self.app.LOAD_PROGRESS.error = "Corrupt flight record"
+        response = self.client.post('/api/analyze-mission', json={"mission": mission})
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("Corrupt flight record", response.get_json()["message"])
+
+        self.app.LOAD_PROGRESS.error = None
+        self.assertEqual(self.client.post('/api/analyze-mission', json={"mission": mission}).status_code, 200)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+import os
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from deconfliction_engine import detect_conflicts, first_conflict
+from metrics import Histogram, STAGE_SECONDS, profile, summarize_profile
+from serving import AnalysisExecutor
+from helpers import make_flight
+
+class TestHistogram(unittest.TestCase):
+    def test_prometheus_rendering(self):
+        histogram = Histogram("test_seconds", "Test timings.", (0.1, 1.0), ("stage",))
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5.0, "a")
+        lines = histogram.render()
+        self.assertIn("# TYPE test_seconds histogram", lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{stage="a"} 3', lines)
+
+class TestProfile(unittest.TestCase):
+    def setUp(self):
+        self.airspace = AirspaceStore.from_flights([make_flight("low", 0), make_flight("high", 500)])
+
+    def test_engine_stages_and_pruning(self):
+        with profile() as collected:
+            detect_conflicts(make_flight("primary", 0), self.airspace)
+        summary = summarize_profile(collected)
+        for stage in ("timestamp", "broad_phase", "narrow_phase"):
+            self.assertIn(stage, summary["stages_ms"])
+        self.assertEqual(summary["candidates"], 1)
+        self.assertEqual(summary["pairs_considered"], 2)
+        self.assertEqual(summary["pruning_ratio"], 0.5)
+        self.assertFalse(summary["cached"])
+
+    def test_first_conflict_and_process_workers(self):
+        with profile() as collected:
+            first_conflict(make_flight("primary", 0), self.airspace)
+        self.assertIn("broad_phase", collected["stages"])
+
+        executor = AnalysisExecutor(self.airspace, mode="process", workers=1)
+        with profile() as collected:
+            executor.run(detect_conflicts, make_flight("primary", 0))
+        executor.shutdown()
+        self.assertIn("narrow_phase", collected["stages"])
+        self.assertEqual(collected["candidates"], 1)
+
+    def test_fork_while_histogram_lock_is_held(self):
+        # Workers forked while a request thread is mid-observation must not inherit the held lock
+        executor = AnalysisExecutor(self.airspace, mode="process", workers=1, timeout=10.0)
+        with STAGE_SECONDS._lock:
+            executor._process_pool()
+        conflicts = executor.run(detect_conflicts, make_flight("primary", 0))
+        executor.shutdown()
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(executor.stats()["pending"], 0)
+
+class TestMetricsEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import app
+        app.LOAD_PROGRESS.finished.wait()
+        cls.client = app.app.test_client()
+
+    def test_metrics_and_debug_profile(self):
+        body = {"mission": make_flight("metrics-primary", 700).dict(exclude_none=True), "profile": True}
+        first = self.client.post('/api/analyze-mission', json=body).get_json()
+        self.assertIn("broad_phase", first["profile"]["stages_ms"])
+        self.assertFalse(first["profile"]["cached"])
+        second = self.client.post('/api/analyze-mission', json=body).get_json()
+        self.assertTrue(second["profile"]["cached"])
+        self.assertNotIn("profile", self.client.post('/api/analyze-mission', json={"mission": body["mission"]}).get_json())
+
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        text = response.get_data(as_text=True)
+        self.assertIn('deconfliction_stage_seconds_count{stage="broad_phase"}', text)
+        self.assertIn("deconfliction_pruning_ratio_bucket", text)
+        self.assertIn("deconfliction_cache_hits_total", text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import sys
+import os
+import unittest
+import numpy as np
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from models import Waypoint
+from deconfliction_engine import batch_segment_conflicts, check_segment_collision
+
+def random_segments(rng, n):
+    start = rng.uniform(0, 200, (n, 3))
+    end = rng.uniform(0, 200, (n, 3))
+    t0 = rng.uniform(0, 100, n)
+    t1 = t0 + rng.uniform(1, 100, n)
+    buffer = rng.uniform(5, 40, n)
+    return np.column_stack([start, end, t0, t1, buffer])
+
+def position(row, t):
+    f = (np.asarray(t) - row[6]) / (row[7] - row[6])
+    return row[0:3] + np.multiply.outer(f, row[3:6] - row[0:3])
+
+class TestNarrowPhase(unittest.TestCase):
+    def test_matches_sampled_minimum_distance(self):
+        rng = np.random.default_rng(7)
+        a, b = random_segments(rng, 200), random_segments(rng, 200)
+        mask, times, locations, distances = batch_segment_conflicts(a, b)
+        for k in range(len(a)):
+            t_start, t_end = max(a[k, 6], b[k, 6]), min(a[k, 7], b[k, 7])
+            if t_start >= t_end:
+                self.assertFalse(mask[k])
+                continue
+            samples = np.linspace(t_start, t_end, 2001)
+            sampled = np.linalg.norm(position(a[k], samples) - position(b[k], samples), axis=1).min()
+            self.assertLessEqual(distances[k], sampled + 1e-6)
+            self.assertAlmostEqual(distances[k], sampled, delta=0.5)
+            np.testing.assert_allclose(locations[k], position(a[k], times[k]), atol=1e-6)
+            self.assertEqual(bool(mask[k]), distances[k] < a[k, 8] + b[k, 8])
+
+    def test_scalar_check_agrees_with_batch(self):
+        wp1, wp2 = Waypoint(x=0, y=0, z=0, timestamp=0.0), Waypoint(x=100, y=0, z=0, timestamp=100.0)
+        wp3, wp4 = Waypoint(x=100, y=5, z=0, timestamp=0.0), Waypoint(x=0, y=5, z=0, timestamp=100.0)
+        conflict = check_segment_collision(wp1, wp2, wp3, wp4, 10.0)
+        self.assertIsNotNone(conflict)
+        self.assertAlmostEqual(conflict.time, 50.0)
+        self.assertAlmostEqual(conflict.distance, 5.0)
+        self.assertIsNone(check_segment_collision(wp1, wp2, wp3, wp4, 5.0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import os
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from cache import ResultCache
+from deconfliction_engine import detect_conflicts
+from helpers import make_flight, make_mission
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.airspace = AirspaceStore.from_flights([make_flight("flight_1", 0)])
+        self.cache = ResultCache(self.airspace, max_entries=2)
+        self.calls = 0
+
+    def analyze(self, mission):
+        def compute():
+            self.calls += 1
+            return detect_conflicts(mission, self.airspace)
+        return self.cache.get_or_compute(mission, compute)
+
+    def test_repeat_is_a_hit(self):
+        first = self.analyze(make_flight("primary", 0))
+        second = self.analyze(make_flight("primary", 0))
+        self.assertTrue(first)
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((self.cache.stats()["hits"], self.cache.stats()["misses"]), (1, 1))
+
+    def test_only_overlapping_entries_are_invalidated(self):
+        self.analyze(make_flight("near", 0))
+        self.analyze(make_mission("far", [(5000, 0), (5100, 100)]))
+        self.airspace.remove_flight("flight_1")
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+        self.assertFalse(self.analyze(make_flight("near", 0)))
+        self.analyze(make_mission("far", [(5000, 0), (5100, 100)]))
+        self.assertEqual(self.calls, 3)
+
+    def test_lru_eviction(self):
+        for x in (0, 1000, 2000):
+            self.analyze(make_mission("primary", [(x, 0), (x + 100, 100)]))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.analyze(make_flight("primary", 0))
+        self.assertEqual(self.calls, 4)
+
+    def test_write_during_compute_is_not_cached(self):
+        mission = make_flight("primary", 0)
+        def compute():
+            result = detect_conflicts(mission, self.airspace)
+            self.airspace.remove_flight("flight_1")
+            return result
+        self.cache.get_or_compute(mission, compute)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+import threading
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from deconfliction_engine import detect_conflicts
+from serving import AnalysisExecutor, AnalysisOverloaded, AnalysisTimeout
+from helpers import make_flight
+
+def wait_for(event, airspace):
+    event.wait()
+    return len(airspace)
+
+class TestAnalysisExecutor(unittest.TestCase):
+    def setUp(self):
+        self.airspace = AirspaceStore.from_flights([make_flight("low", 0)])
+
+    def test_runs_against_airspace(self):
+        executor = AnalysisExecutor(self.airspace, workers=2, max_pending=4)
+        conflicts = executor.run(detect_conflicts, make_flight("primary", 0))
+        self.assertEqual(len(conflicts), len(detect_conflicts(make_flight("primary", 0), self.airspace)))
+        executor.shutdown()
+
+    def test_backpressure_and_timeout(self):
+        executor = AnalysisExecutor(self.airspace, mode="thread", workers=1, max_pending=1, timeout=0.05)
+        release = threading.Event()
+        with self.assertRaises(AnalysisTimeout):
+            executor.run(wait_for, release)
+        # The timed-out analysis still holds its slot until it really finishes
+        with self.assertRaises(AnalysisOverloaded):
+            executor.submit(wait_for, release)
+        self.assertEqual(executor.stats()["pending"], 1)
+        release.set()
+        executor.shutdown()
+        executor = AnalysisExecutor(self.airspace, mode="thread", workers=1, max_pending=1)
+        self.assertEqual(executor.run(wait_for, release), 1)
+        self.assertEqual(executor.stats()["pending"], 0)
+        executor.shutdown()
+
+    def test_process_mode_follows_writes(self):
+        executor = AnalysisExecutor(self.airspace, mode="process", workers=2, max_pending=4)
+        primary = make_flight("primary", 200)
+        self.assertEqual(executor.run(detect_conflicts, primary), [])
+        pool = executor._pool
+        # Filings, amendments and cancellations reach the workers without re-forking them
+        self.airspace.add_flight(make_flight("high", 200))
+        self.assertTrue(executor.run(detect_conflicts, primary))
+        self.airspace.update_flight(make_flight("high", 400))
+        self.assertEqual(executor.run(detect_conflicts, primary), [])
+        self.airspace.update_flight(make_flight("high", 200))
+        self.airspace.remove_flight("low")
+        self.assertEqual([c.involved_flights for c in executor.run(detect_conflicts, primary)],
+                         [c.involved_flights for c in detect_conflicts(primary, self.airspace)])
+        self.assertIs(executor._pool, pool)
+        self.assertEqual(executor.stats()["unsynced_writes"], 6)  # An amendment is a removal and an addition
+        executor.shutdown()
+
+    def test_process_pool_refresh_is_rate_limited(self):
+        executor = AnalysisExecutor(self.airspace, mode="process", workers=1, delta_limit=1, refresh_interval=3600.0)
+        primary = make_flight("primary", 200)
+        executor.run(detect_conflicts, primary)
+        pool = executor._pool
+        for z in (300, 400, 200):
+            self.airspace.add_flight(make_flight(f"high-{z}", z))
+        self.assertEqual(len(executor.run(detect_conflicts, primary)), len(detect_conflicts(primary, self.airspace)))
+        self.assertIs(executor._pool, pool)  # Past the limit, but refreshed too recently
+        executor.refresh_interval = 0.0
+        executor.run(detect_conflicts, primary)
+        self.assertIsNot(executor._pool, pool)
+        self.assertEqual(executor.stats()["unsynced_writes"], 0)
+        executor.shutdown()
+        self.assertNotIn(executor._on_flight_changed, self.airspace.listeners)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import os
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from deconfliction_engine import is_clear
+from slots import find_departure_slots
+from helpers import make_mission
+
+# Ground-level flights with a 5 m buffer, all in the air for t in [1000, 1400]
+SHORT_FLIGHT = {"start_time": 1000.0, "duration": 400.0, "safety_buffer": 5.0}
+
+def shifted(mission, shift):
+    return mission.copy(update={"start_time": mission.start_time + shift, "end_time": mission.end_time + shift})
+
+class TestDepartureSlots(unittest.TestCase):
+    def setUp(self):
+        # A crossing flight that meets the primary at (250, 200) around t=1250
+        self.airspace = AirspaceStore.from_flights(
+            [make_mission("crossing", [(250, 0), (250, 320)], **SHORT_FLIGHT)], grid_size=50.0)
+        self.primary = make_mission("primary", [(0, 200), (100, 200), (200, 200), (300, 200), (400, 200)],
+                                    **SHORT_FLIGHT)
+
+    def test_earliest_slot_is_clear_and_tight(self):
+        self.assertFalse(is_clear(self.primary, self.airspace))
+        slots = find_departure_slots(self.primary, 0.0, 100.0, self.airspace)
+        self.assertEqual(len(slots), 1)
+        slot = slots[0]
+        self.assertGreater(slot.shift, 0.0)
+        self.assertEqual(slot.shift_end, 100.0)
+        self.assertAlmostEqual(slot.start_time, self.primary.start_time + slot.shift)
+        self.assertTrue(is_clear(shifted(self.primary, slot.shift), self.airspace))
+        # Departing noticeably earlier than the slot still conflicts
+        self.assertFalse(is_clear(shifted(self.primary, slot.shift - 0.5), self.airspace))
+
+    def test_slots_cover_both_sides_of_the_conflict(self):
+        slots = find_departure_slots(self.primary, -100.0, 100.0, self.airspace, limit=0)
+        self.assertEqual(len(slots), 2)
+        before, after = slots
+        self.assertEqual(before.shift_start, -100.0)
+        self.assertLess(before.shift_end, 0.0)
+        self.assertGreater(after.shift_start, 0.0)
+        for slot in slots:
+            for shift in (slot.shift_start, slot.shift_end):
+                self.assertTrue(is_clear(shifted(self.primary, shift), self.airspace))
+        middle = (before.shift_end + after.shift_start) / 2.0
+        self.assertFalse(is_clear(shifted(self.primary, middle), self.airspace))
+
+    def test_nearest_order(self):
+        slots = find_departure_slots(self.primary, -100.0, 100.0, self.airspace, limit=0, order="nearest")
+        self.assertEqual(len(slots), 2)
+        self.assertLessEqual(abs(slots[0].shift), abs(slots[1].shift))
+        self.assertIn(slots[0].shift, (slots[0].shift_start, slots[0].shift_end))
+
+    def test_clear_mission_keeps_its_departure(self):
+        clear = make_mission("primary", [(0, 400), (400, 400)], **SHORT_FLIGHT)
+        slots = find_departure_slots(clear, 0.0, 50.0, self.airspace, order="nearest")
+        self.assertEqual(slots[0].shift, 0.0)
+
+    def test_blocked_window(self):
+        # A drone hovering on the primary's route for the whole day leaves no slot
+        self.airspace.add_flight(make_mission("hover", [(100, 200)], start_time=0.0, duration=86400.0,
+                                                safety_buffer=5.0))
+        self.assertEqual(find_departure_slots(self.primary, -500.0, 500.0, self.airspace), [])
+
+    def test_rejects_unknown_order(self):
+        with self.assertRaises(ValueError):
+            find_departure_slots(self.primary, 0.0, 10.0, self.airspace, order="latest")
+
+class TestFindSlotsEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import app
+        app.LOAD_PROGRESS.finished.wait()
+        cls.app = app
+        cls.client = app.app.test_client()
+
+    def setUp(self):
+        self.app.AIRSPACE.add_flight(make_mission("slot-crossing", [(250, 0), (250, 320)], **SHORT_FLIGHT))
+        self.addCleanup(self.app.AIRSPACE.remove_flight, "slot-crossing")
+
+    def test_find_slots(self):
+        mission = make_mission("slot-primary", [(0, 200), (400, 200)], **SHORT_FLIGHT).dict()
+        response = self.client.post('/api/find-slots', json={"mission": mission, "departure_window": [1000, 1100]})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body["status"], "found")
+        self.assertGreater(body["slots"][0]["start_time"], 1000.0)
+
+    def test_bad_request(self):
+        response = self.client.post('/api/find-slots', json={"departure_window": [0, 10]})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    unittest.main()
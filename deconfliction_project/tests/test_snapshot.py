@@ -0,0 +1,56 @@
+import sys
+import os
+import tempfile
+import unittest
+import numpy as np
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from loader import load_flights
+from snapshot import export_snapshot, load_snapshot
+from deconfliction_engine import detect_conflicts, detect_conflicts_batch
+from helpers import make_mission
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_simulated_flights.json')
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "airspace.snap")
+        self.airspace = AirspaceStore()
+        load_flights(SAMPLE_FILE, self.airspace)
+        export_snapshot(self.airspace, self.path)
+        self.missions = [make_mission(f"primary_{i}", [(10 * i, 20), (10 * i + 40, 60)], 5 * i) for i in range(10)]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_matches_original(self):
+        mapped = load_snapshot(self.path)
+        self.assertEqual(sorted(mapped.flights), sorted(self.airspace.flights))
+        self.assertIsInstance(mapped.get("flight_1").segments.base, np.memmap)
+        for mission in self.missions:
+            self.assertEqual([c.dict() for c in detect_conflicts(mission, mapped)],
+                             [c.dict() for c in detect_conflicts(mission, self.airspace)])
+
+    def test_writes_on_mapped_store(self):
+        mapped = load_snapshot(self.path)
+        for drone_id in list(mapped.flights):
+            mapped.remove_flight(drone_id)
+        self.assertIsNone(mapped.snapshot_path)
+        self.assertFalse(detect_conflicts(self.missions[1], mapped))
+        mapped.add_flight(make_mission("flight_1", [(10, 20), (50, 60)], 5))
+        self.assertTrue(detect_conflicts(self.missions[1], mapped))
+
+    def test_batch_workers_map_snapshot(self):
+        mapped = load_snapshot(self.path)
+        results = detect_conflicts_batch(self.missions, mapped, workers=2)
+        self.assertEqual([[c.dict() for c in r] for r in results],
+                         [[c.dict() for c in detect_conflicts(m, self.airspace)] for m in self.missions])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import unittest
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from models import Mission, Waypoint
+from trajectory import Trajectory
+
+class TestTrajectory(unittest.TestCase):
+    def setUp(self):
+        self.mission = Mission(
+            drone_id="primary",
+            waypoints=[Waypoint(x=0, y=0, z=0), Waypoint(x=30, y=40, z=0), Waypoint(x=30, y=40, z=50)],
+            start_time=1620000000.0,
+            end_time=1620000100.0,
+            speed=5.0,
+            safety_buffer=10.0
+        )
+
+    def test_timestamps_match_assign_timestamps(self):
+        trajectory = Trajectory.from_mission(self.mission)
+        self.assertIsNone(self.mission.waypoints[1].timestamp)
+        self.mission.assign_timestamps()
+        self.assertEqual(list(trajectory.times), [wp.timestamp for wp in self.mission.waypoints])
+        self.assertEqual(trajectory.segments.shape, (2, 9))
+
+    def test_position_at(self):
+        trajectory = Trajectory.from_mission(self.mission)
+        self.assertEqual(list(trajectory.position_at(1620000025.0)), [15.0, 20.0, 0.0])
+        self.assertIsNone(trajectory.position_at(1620000200.0))
+
+    def test_static_round_trip(self):
+        self.mission.waypoints = self.mission.waypoints[:1]
+        trajectory = Trajectory.from_mission(self.mission)
+        self.assertTrue(trajectory.static)
+        self.assertEqual(list(trajectory.segments[0, 6:8]), [1620000000.0, 1620000100.0])
+        flight = trajectory.to_mission()
+        self.assertEqual(len(flight.waypoints), 1)
+        self.assertEqual(flight.waypoints[0].timestamp, 1620000000.0)
+
+if __name__ == "__main__":
+    unittest.main()
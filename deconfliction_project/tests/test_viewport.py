@@ -0,0 +1,114 @@
+import sys
+import os
+import unittest
+import numpy as np
+
+# Add src/ to the module search path
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from airspace import AirspaceStore
+from utils import simplify_path
+from viewport import flights_in_view, render_flight
+from helpers import make_mission
+
+# Flights at 10 m, in the air for t in [1000, 2000]
+VIEW_FLIGHT = {"z": 10, "start_time": 1000.0, "duration": 1000.0, "safety_buffer": 5.0}
+
+class TestSimplifyPath(unittest.TestCase):
+    def test_drops_only_points_within_tolerance(self):
+        points = np.array([[0, 0, 0], [50, 1, 0], [100, 0, 0], [150, 40, 0], [200, 0, 0]], dtype=float)
+        times = np.linspace(0, 100, 5)
+        self.assertEqual(simplify_path(points, times, 5.0).tolist(), [0, 2, 3, 4])
+        self.assertEqual(simplify_path(points, times, 50.0).tolist(), [0, 4])
+        self.assertEqual(simplify_path(points, times, 0.0).tolist(), [0, 1, 2, 3, 4])
+
+    def test_synchronized_distance(self):
+        # A collinear point reached at the wrong time still matters for animated positions
+        points = np.array([[0, 0, 0], [10, 0, 0], [100, 0, 0]], dtype=float)
+        self.assertEqual(simplify_path(points, np.array([0.0, 50.0, 100.0]), 5.0).tolist(), [0, 1, 2])
+        self.assertEqual(simplify_path(points, np.array([0.0, 10.0, 100.0]), 5.0).tolist(), [0, 2])
+
+class TestViewport(unittest.TestCase):
+    def setUp(self):
+        self.airspace = AirspaceStore.from_flights([
+            make_mission("west", [(0, 0), (100, 0), (200, 0)], **VIEW_FLIGHT),
+            make_mission("east", [(5000, 0), (5100, 0)], **VIEW_FLIGHT),
+            make_mission("late", [(0, 10), (100, 10)], z=10, start_time=9000.0, duration=500.0,
+                         safety_buffer=5.0)
+        ], grid_size=50.0)
+
+    def view(self, lo, hi, start_time=-np.inf, end_time=np.inf):
+        return [t.drone_id for t in flights_in_view(self.airspace, lo, hi, start_time, end_time)]
+
+    def test_filters_by_box_and_time(self):
+        inf = np.inf
+        self.assertEqual(self.view([-inf] * 3, [inf] * 3), ["east", "late", "west"])
+        self.assertEqual(self.view([0, 0, 0], [300, 300, 100]), ["late", "west"])
+        self.assertEqual(self.view([0, 0, 0], [300, 300, 100], 0.0, 3000.0), ["west"])
+        self.assertEqual(self.view([4900, -10, -inf], [inf, 10, inf]), ["east"])
+        # West is only east of x=150 during the last quarter of its flight
+        self.assertEqual(self.view([150, -10, 0], [300, 10, 100], 1000.0, 1500.0), [])
+        self.assertEqual(self.view([150, -10, 0], [300, 10, 100], 1700.0, 1800.0), ["west"])
+
+    def test_region_lookup_matches_cell_scan(self):
+        # Small boxes look their cells up directly; the result must match scanning every cell
+        index = self.airspace.index
+        for lo, hi, start_time, end_time in [([0, -10, 0], [60, 10, 20], 1000.0, 1100.0),
+                                             ([4990, -5, 0], [5010, 5, 20], -np.inf, np.inf),
+                                             ([-np.inf] * 3, [np.inf] * 3, 9000.0, 9100.0)]:
+            cell_lo = np.floor(np.append(np.divide(lo, index.grid_size), start_time / index.time_bucket))
+            cell_hi = np.floor(np.append(np.divide(hi, index.grid_size), end_time / index.time_bucket))
+            expected = {(entry[0].drone_id, entry[1]) for key, entries in index.cells.items()
+                        if all(cell_lo[d] <= key[d] <= cell_hi[d] for d in range(4)) for entry in entries
+                        if entry[0].segments[entry[1], 6] <= end_time and start_time <= entry[0].segments[entry[1], 7]}
+            found = {(trajectory.drone_id, segment_idx)
+                     for trajectory, segment_idx in index.query_region(lo, hi, start_time, end_time)}
+            self.assertEqual(found, expected)
+            self.assertTrue(found)
+
+    def test_render_clips_to_window(self):
+        west = self.airspace.get("west")
+        rendered = render_flight(west, 0.0, 1600.0, 1700.0)
+        self.assertEqual([wp["x"] for wp in rendered["waypoints"]], [100.0, 200.0])
+        self.assertEqual(rendered["original_waypoints"], 3)
+        self.assertEqual(len(render_flight(west, 1.0)["waypoints"]), 2)  # The middle point is collinear
+
+class TestViewportEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import app
+        app.LOAD_PROGRESS.finished.wait()
+        cls.app = app
+        cls.client = app.app.test_client()
+
+    def file(self, drone_id):
+        self.client.post('/api/flights', json={"drone_id": drone_id, "waypoints": [{"x": 1, "y": 1, "z": 1}],
+                                               "start_time": 1.0, "end_time": 2.0})
+        self.addCleanup(self.client.delete, f'/api/flights/{drone_id}')
+
+    def test_paging_streaming_and_etag(self):
+        self.file("viewport-a")
+        self.file("viewport-b")
+        url = '/api/flights?limit=1&min_x=0&min_y=0&max_x=10&max_y=10&max_z=10&end=10'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual([flight["drone_id"] for flight in body["flights"]], ["viewport-a"])
+        self.assertEqual(body["total"], 2)
+        following = self.client.get(url + f'&after={body["next_cursor"]}').get_json()
+        self.assertEqual([flight["drone_id"] for flight in following["flights"]], ["viewport-b"])
+        self.assertIsNone(following["next_cursor"])
+
+        etag = response.headers["ETag"]
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        self.file("viewport-c")
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 200)
+
+        streamed = self.client.get('/api/flights?format=ndjson')
+        self.assertEqual(streamed.mimetype, "application/x-ndjson")
+        self.assertEqual(len(streamed.get_data(as_text=True).splitlines()), len(self.app.AIRSPACE))
+
+if __name__ == '__main__':
+    unittest.main()